@@ -19,7 +19,7 @@ from google.genai import types
 from models.config import DEFAULT_MODEL_ID, GEMINI_API_KEY
 from models.exceptions import APIError, ValidationError
 from utils.logger import logger
-from utils.llm import string_to_pjson
+from utils.llm import parse_pjson
 
 
 @dataclass
@@ -174,11 +174,11 @@ class IdeaGenerationAgent:
         logger.info(f"[Agent] Generating initial story for idea: {idea[:50]}...")
         response = self._call_llm(system_instruction, prompt)
 
-        json_str = string_to_pjson(response)
-        if json_str is None:
+        parsed = parse_pjson(response)
+        if parsed is None:
             raise ValidationError("LLM did not return valid JSON")
 
-        return json.loads(json_str)
+        return parsed
 
     def _critique_story(self, story: Dict, idea: str, style: str) -> CritiqueResult:
         """
@@ -241,12 +241,10 @@ class IdeaGenerationAgent:
         logger.info("[Agent] Critiquing story structure...")
         response = self._call_llm(system_instruction, prompt)
 
-        json_str = string_to_pjson(response)
-        if json_str is None:
+        critique_data = parse_pjson(response)
+        if critique_data is None:
             raise ValidationError("Critique did not return valid JSON")
 
-        critique_data = json.loads(json_str)
-
         score = float(critique_data["score"])
         passes = score >= self.QUALITY_THRESHOLD
 
@@ -332,11 +330,11 @@ class IdeaGenerationAgent:
         logger.info(f"[Agent] Refining story based on critique (score: {critique.score})...")
         response = self._call_llm(system_instruction, prompt)
 
-        json_str = string_to_pjson(response)
-        if json_str is None:
+        parsed = parse_pjson(response)
+        if parsed is None:
             raise ValidationError("Refinement did not return valid JSON")
 
-        return json.loads(json_str)
+        return parsed
 
     def generate_story(self, idea: str, style: str = "Studio Ghibli") -> Tuple[List[Dict], str, str]:
         """
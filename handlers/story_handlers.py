@@ -3,9 +3,15 @@ import json
 import os
 import uuid
 import time
-from utils.llm import call_llm
+from utils.llm import call_llm, parse_pjson
 from utils.logger import logger
-from utils.prompt_templates import generate_story_prompt, update_story_prompt, develop_story_prompt
+from utils.prompt_templates import (
+    generate_story_prompt,
+    update_story_prompt,
+    develop_story_prompt,
+    batch_scene_prompt,
+    VEO_PROMPT_SYSTEM_INSTRUCTION
+)
 from utils.gen_image import gen_images, gen_images_by_banana
 from utils.acceptance import to_snake_case_v2
 from PIL import Image
@@ -14,13 +20,20 @@ from handlers.ui_handlers import check_folder, clear_temp_files
 from utils.config import (
     CHARACTERS_DIR,
     VIDEOS_DIR,
-    STORY_JSON
+    STORY_JSON,
+    DEVELOP_STORY_CACHE_TTL_SECONDS
 )
-from utils.save_files import save_characters, save_setting, save_plot, save_story
+from utils.save_files import save_bundle, save_story, save_script
+from utils.response_cache import cached_response, cache_key
+from utils import json_compat, semantic_cache
 from models.config import DEFAULT_MODEL_ID
 from agents import IdeaGenerationAgent, IdeaGenerationAgentADK
 from agents.scene_development_agent_adk import SceneDevelopmentAgentADK
 
+# Full scene development is the most expensive LLM call; identical inputs may reuse it
+# when DEVELOP_STORY_CACHE_TTL_SECONDS is set (off by default, so develop gives a new take)
+_call_llm_cached = cached_response(call_llm, DEVELOP_STORY_CACHE_TTL_SECONDS, validate=json.loads)
+
 def generate_story(idea, style="Studio Ghibli", use_agent=True, use_adk=True):
     """
     Generate story structure from user idea.
@@ -59,15 +72,19 @@ def generate_story(idea, style="Studio Ghibli", use_agent=True, use_adk=True):
         logger.info(f"[{operation_id}] Using traditional single-shot generation")
         system_instruction, prompt = generate_story_prompt(idea)
         history = ""
-        string_response = call_llm(system_instruction, prompt, history, DEFAULT_MODEL_ID)
+        # With SEMANTIC_CACHE_TTL_SECONDS set, rephrasings of an idea already seen reuse its story
+        namespace = cache_key(system_instruction, DEFAULT_MODEL_ID)
+        cached = semantic_cache.lookup(namespace, idea)
+        string_response = cached or call_llm(system_instruction, prompt, history, DEFAULT_MODEL_ID)
         json_response = json.loads(string_response)
         characters = json_response["characters"]
         setting = json_response["setting"]
         plot = json_response["plot"]
+        # Only a response that parsed into a complete story is worth reusing
+        if cached is None:
+            semantic_cache.remember(namespace, idea, string_response)
 
-    save_characters(characters)
-    save_setting(setting)
-    save_plot(plot)
+    save_bundle(characters, setting, plot)
 
     logger.info(f"[{operation_id}] Story generation completed successfully")
     return characters, setting, plot
@@ -80,9 +97,7 @@ def update_story(idea, characters):
     setting = json_response["setting"]
     plot = json_response["plot"]
 
-    save_characters(characters)
-    save_setting(setting)
-    save_plot(plot)
+    save_bundle(characters, setting, plot)
 
     return setting, plot
 
@@ -156,38 +171,27 @@ def generate_character_images(*args):
     return generated_images
 
 
-def prepare_veo_prompt(story_json:list[dict], characters:list[dict], model_id:str):
+def prepare_veo_prompt(story_json:list[dict], characters:list[dict], model_id:str, batch_size:int=5):
+    # Several scenes per Gemini call; each batch answers with a JSON array of prompts
     veo_prompts=[]
-    system_instruction = """
-            You are a prompting expert, your task is to create the best prompt for Veo to generate a high-quality video for a scene.
-    """
-    for scene in story_json:
-        p_prompt = f"""
-            Based on the scene description provided below, create a detailed prompt for generating a high-quality video. Include the following elements in your prompt:
-
-            - Subject: The object, person, animal, or scenery that you want in your video.
-            - Context: The background or context in which the subject is placed.
-            - Action: What the subject is doing (for example, walking, running, or turning their head).
-            - Style: This can be general or very specific. Consider using specific film style keywords, such as horror film, film noir, or animated styles like cartoon style render.
-            - Camera motion: Optional: What the camera is doing, such as aerial view, eye-level, top-down shot, or low-angle shot.
-            - Composition: Optional: How the shot is framed, such as wide shot, close-up, or extreme close-up.
-            - Ambiance: Optional: How the color and light contribute to the scene, such as blue tones, night, or warm tones.
-            - Dialog if any
-
-            Notice:
-            - To differentiate between multiple characters in the images, use the most distinguish descriptive details variable.
-            - Output as plain text as prompt without any explaination.
-
-            Here is the scene description:
-            {scene}
-
-            Here is the charaters description:
-            {characters}
-        """
-        pp = call_llm(system_instruction, p_prompt, "", model_id)
+    for start, p_prompt in zip(range(0, len(story_json), batch_size),
+                               batch_scene_prompt(story_json, characters, batch_size)):
+        batch = story_json[start:start + batch_size]
+        response = call_llm(VEO_PROMPT_SYSTEM_INSTRUCTION, p_prompt, "", model_id)
+        prompts = parse_pjson(response)
+        if not (isinstance(prompts, list) and len(prompts) == len(batch)
+                and all(isinstance(pp, str) for pp in prompts)):
+            logger.warning(f"Batched Veo prompt response did not contain {len(batch)} prompts, retrying one scene at a time")
+            prompts = []
+            for scene in batch:
+                single = call_llm(VEO_PROMPT_SYSTEM_INSTRUCTION, batch_scene_prompt([scene], characters)[0], "", model_id)
+                parsed = parse_pjson(single)
+                prompts.append(parsed[0] if isinstance(parsed, list) and parsed and isinstance(parsed[0], str) else single)
+        veo_prompts.extend(prompts)
+
+    for scene, pp in zip(story_json, veo_prompts):
         logger.info(f"Generated Veo prompt for scene {scene['scene_number']}: {pp[:100]}...")
         logger.debug(f"Full Veo prompt for scene {scene['scene_number']}: {pp}")
-        veo_prompts.append(pp)
 
     return veo_prompts
 
@@ -253,9 +257,7 @@ def developing_story(*args):
     clear_temp_files(f"{VIDEOS_DIR}", ".*")
 
     # Save the story data
-    save_characters(characters)
-    save_setting(setting)
-    save_plot(plot)
+    save_bundle(characters, setting, plot)
 
     # Generate the story development
     if use_scene_adk:
@@ -287,7 +289,7 @@ def developing_story(*args):
         system_instruction, prompt = develop_story_prompt(characters, setting, plot, number_of_scenes, duration_per_scene, style)
         history = ""
         logger.debug(f"[{operation_id}] Story prompt: {prompt[:200]}...")
-        string_response = call_llm(system_instruction, prompt, history, model_id)
+        string_response = _call_llm_cached(system_instruction, prompt, history, model_id)
         story_json = json.loads(string_response)
 
     # Save full story to file
@@ -351,13 +353,10 @@ def developing_story(*args):
         with open(video_prompt_file, "w") as f:
             f.write(json.dumps(scene, indent=4))
 
-        video_script_file = f"{VIDEOS_DIR}/scene_script_{i}.json"
-        with open(video_script_file, "w") as f:
-            f.write(json.dumps(scene["dialogue"], indent=4))
-        
-        video_script_file_v31 = f"{VIDEOS_DIR}/v31_scene_script_{i}.json"
-        with open(video_script_file_v31, "w") as f:
-            f.write(json.dumps(scene["dialogue"], indent=4))
+        # Serialize the dialogue once and write it for both storyboard tabs
+        video_script = json_compat.dumps(scene["dialogue"], pretty=True)
+        save_script(i, video_script, False)
+        save_script(i, video_script, True)
     ###
 
     # Generate images and save prompts for each scene in "Visual Storyboard v31" Tab
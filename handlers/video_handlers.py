@@ -10,7 +10,7 @@ from handlers.ui_handlers import clear_temp_files
 from utils.config import STORY_JSON, VIDEOS_DIR, MERGED_VIDEO_MP4
 from utils.llm import call_llm
 from utils.logger import logger
-from utils.save_files import save_script
+from utils.save_files import save_scripts
 from agents.video_quality_agent import VideoQualityAgent
 
 
@@ -89,8 +89,7 @@ def generate_video_v31(*args):
 
 def generate_video(chosen_veo_model_id, is_generate_audio, *args):
     script_texts = list(args)
-    for i in range(12):
-        save_script(i+1, script_texts[i], False)
+    save_scripts(script_texts[:12], False)
 
     clear_temp_files(VIDEOS_DIR, "_0.mp4")
 
@@ -198,8 +197,7 @@ def generate_video_v31_with_validation(*args):
         return all_files, None
 
     # Save scripts
-    for i in range(12):
-        save_script(i+1, script_texts_v31[i], True)
+    save_scripts(script_texts_v31[:12], True)
 
     # Load character references and scene data
     character_refs = load_character_references()
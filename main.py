@@ -17,7 +17,7 @@ from handlers.audio_handlers import generate_audio, show_generated_audios, merge
 from handlers.ui_handlers import show_story_details, show_images_and_prompts, show_images_and_prompts_v31, play_audio, update_character_visibility, show_story
 from utils.video_ts import merge_videos_moviepy
 from utils.config import VIDEOS_DIR
-from utils.status_helper import append_status, format_status_display
+from utils.status_helper import append_status, format_status_display, clear_status, Level
 from utils.save_files import save_script
 
 with gr.Blocks(
@@ -97,7 +97,7 @@ with gr.Blocks(
             # gr.Button("Logout", link="/logout", scale=1)
 
     # Global state for status messages (defined early so all handlers can use it)
-    status_messages = gr.State([])
+    status_messages = gr.State(clear_status())
 
     # Tab 1: Idea Tab
     ta_idea, dd_style, cb_use_agent, cb_use_adk, btn_random_idea, btn_generate_story = idea_tab()
@@ -118,7 +118,7 @@ with gr.Blocks(
         messages = append_status(
             "Generating random story idea...",
             current_messages,
-            "PROGRESS"
+            Level.PROGRESS
         )
 
         try:
@@ -126,14 +126,14 @@ with gr.Blocks(
             messages = append_status(
                 "Random idea generated!",
                 messages,
-                "SUCCESS"
+                Level.SUCCESS
             )
             return result, messages, format_status_display(messages)
         except Exception as e:
             messages = append_status(
                 f"Random idea generation failed: {str(e)}",
                 messages,
-                "ERROR"
+                Level.ERROR
             )
             return "", messages, format_status_display(messages)
 
@@ -152,7 +152,7 @@ with gr.Blocks(
         messages = append_status(
             f"Starting scene development ({number_of_scenes} scenes, {style} style, ADK={'ON' if use_scene_adk else 'OFF'})",
             current_messages,
-            "PROGRESS"
+            Level.PROGRESS
         )
         yield messages, format_status_display(messages)
 
@@ -164,7 +164,7 @@ with gr.Blocks(
             messages = append_status(
                 f"Scene development complete! Generated {number_of_scenes} scenes",
                 messages,
-                "SUCCESS"
+                Level.SUCCESS
             )
             yield messages, format_status_display(messages)
 
@@ -173,7 +173,7 @@ with gr.Blocks(
             messages = append_status(
                 f"Scene development failed: {str(e)}",
                 messages,
-                "ERROR"
+                Level.ERROR
             )
             yield messages, format_status_display(messages)
             raise
@@ -234,7 +234,7 @@ with gr.Blocks(
         messages = append_status(
             f"Generating character images ({number_of_characters} character{'s' if number_of_characters > 1 else ''})...",
             current_messages,
-            "PROGRESS"
+            Level.PROGRESS
         )
         yield [None] * 6 + [messages, format_status_display(messages)]
 
@@ -246,7 +246,7 @@ with gr.Blocks(
             messages = append_status(
                 f"Character images generated successfully!",
                 messages,
-                "SUCCESS"
+                Level.SUCCESS
             )
             yield list(result) + [messages, format_status_display(messages)]
 
@@ -255,7 +255,7 @@ with gr.Blocks(
             messages = append_status(
                 f"Character image generation failed: {str(e)}",
                 messages,
-                "ERROR"
+                Level.ERROR
             )
             yield [None] * 6 + [messages, format_status_display(messages)]
             raise
@@ -272,7 +272,7 @@ with gr.Blocks(
         messages = append_status(
             f"Generating story from idea (Agent: {'ADK' if use_adk else 'Original' if use_agent else 'None'})...",
             current_messages,
-            "PROGRESS"
+            Level.PROGRESS
         )
         status_update = messages, format_status_display(messages)
 
@@ -284,7 +284,7 @@ with gr.Blocks(
             messages = append_status(
                 f"Story generated! {len(character_list)} character(s) created",
                 messages,
-                "SUCCESS"
+                Level.SUCCESS
             )
             return result + [messages, format_status_display(messages)]
 
@@ -293,7 +293,7 @@ with gr.Blocks(
             messages = append_status(
                 f"Story generation failed: {str(e)}",
                 messages,
-                "ERROR"
+                Level.ERROR
             )
             # Return empty results with error status
             empty_result = show_story()
@@ -315,7 +315,7 @@ with gr.Blocks(
         messages = append_status(
             f"Updating to {number_of_characters} character(s)...",
             current_messages,
-            "PROGRESS"
+            Level.PROGRESS
         )
 
         try:
@@ -327,7 +327,7 @@ with gr.Blocks(
             messages = append_status(
                 f"Story updated with {number_of_characters} character(s)",
                 messages,
-                "SUCCESS"
+                Level.SUCCESS
             )
             return result + [messages, format_status_display(messages)]
 
@@ -335,7 +335,7 @@ with gr.Blocks(
             messages = append_status(
                 f"Update failed: {str(e)}",
                 messages,
-                "ERROR"
+                Level.ERROR
             )
             empty_result = show_story()
             return empty_result + [messages, format_status_display(messages)]
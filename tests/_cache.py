@@ -0,0 +1,69 @@
+"""
+Disk cache for agent outputs used by the integration test scripts.
+
+Agent runs take minutes while the assertions on their output are cheap, so
+caching the generated scenes lets a test script be re-run quickly while the
+checks are being edited. Entries are keyed on the agent's source code and the
+call arguments, so changing the agent invalidates them.
+
+Set NO_AGENT_CACHE=1 (or pass --no-cache to a test script) to always call the agent.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+from utils.save_files import write_atomic
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".tests_agent_cache")
+CACHE_TTL_SECONDS = 86400
+
+_enabled = not os.getenv("NO_AGENT_CACHE")
+
+
+def disable_cache() -> None:
+    """Bypass the cache for the rest of the process."""
+    global _enabled
+    _enabled = False
+
+
+def _cache_key(agent: Any, method: str, kwargs: Dict[str, Any]) -> str:
+    """Hash the agent source, model and call arguments into a cache key."""
+    source_hash = hashlib.sha256(inspect.getsource(type(agent)).encode()).hexdigest()
+    payload = json.dumps(
+        {
+            "agent": source_hash,
+            "model_id": getattr(agent, "model_id", None),
+            "method": method,
+            "kwargs": kwargs,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def develop_scenes_cached(agent: Any, **kwargs: Any) -> List[Dict]:
+    """
+    Call agent.develop_scenes(**kwargs), reusing a fresh on-disk result if one exists.
+
+    Only the returned scenes are cached; on a cache hit the agent's iteration
+    history is left empty, so tests that inspect it should call the agent directly.
+    """
+    if not _enabled:
+        return agent.develop_scenes(**kwargs)
+
+    path = os.path.join(CACHE_DIR, f"{_cache_key(agent, 'develop_scenes', kwargs)}.json")
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < CACHE_TTL_SECONDS:
+        with open(path, "r") as f:
+            print(f"♻️  Using cached scenes: {os.path.basename(path)}")
+            return json.load(f)
+
+    scenes = agent.develop_scenes(**kwargs)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    write_atomic(path, json.dumps(scenes).encode("utf-8"))
+    return scenes
@@ -2,17 +2,20 @@
 Test script for SceneDevelopmentAgentADK.
 
 This script tests the ADK-based scene development agent with sample story data.
-Run with: python test_scene_development_adk.py
+Run with: python test_scene_development_adk.py [--no-cache]
 """
 
 import asyncio
+import concurrent.futures
 import json
+import sys
 import time
 from typing import Dict, List
 
 from agents.scene_development_agent_adk import SceneDevelopmentAgentADK
 from models.config import DEFAULT_MODEL_ID
 from utils.logger import logger
+from tests._cache import develop_scenes_cached, disable_cache
 
 
 # ============================================================================
@@ -123,7 +126,8 @@ def test_sync_scene_development():
         print("Generating scenes (this may take 2-3 minutes)...\n")
         start_time = time.time()
 
-        scenes = agent.develop_scenes(
+        scenes = develop_scenes_cached(
+            agent,
             characters=SAMPLE_CHARACTERS,
             setting=SAMPLE_SETTING,
             plot=SAMPLE_PLOT,
@@ -201,6 +205,23 @@ async def test_async_scene_development():
         return False
 
 
+def _run_scene_count_case(case: Dict):
+    """Develop scenes for one test case, returning (agent, scenes, duration)."""
+    agent = SceneDevelopmentAgentADK(model_id=DEFAULT_MODEL_ID)
+
+    start_time = time.time()
+    scenes = develop_scenes_cached(
+        agent,
+        characters=SAMPLE_CHARACTERS[:1],  # Use just one character for speed
+        setting=SAMPLE_SETTING,
+        plot=SAMPLE_PLOT,
+        number_of_scenes=case['scenes'],
+        duration_per_scene=case['duration'],
+        style=case['style']
+    )
+    return agent, scenes, time.time() - start_time
+
+
 def test_different_scene_counts():
     """Test with different scene counts."""
     print_separator("TEST 3: Different Scene Counts")
@@ -210,23 +231,16 @@ def test_different_scene_counts():
         {"scenes": 9, "duration": 5, "style": "Studio Ghibli"},
     ]
 
-    for i, case in enumerate(test_cases, 1):
+    # Cases are independent and network-bound, so run them side by side
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(test_cases)) as executor:
+        futures = [executor.submit(_run_scene_count_case, case) for case in test_cases]
+
+    for i, (case, future) in enumerate(zip(test_cases, futures), 1):
         print(f"\nTest Case {i}: {case['scenes']} scenes, {case['duration']}s each, {case['style']} style")
         print("-" * 80)
 
         try:
-            agent = SceneDevelopmentAgentADK(model_id=DEFAULT_MODEL_ID)
-
-            start_time = time.time()
-            scenes = agent.develop_scenes(
-                characters=SAMPLE_CHARACTERS[:1],  # Use just one character for speed
-                setting=SAMPLE_SETTING,
-                plot=SAMPLE_PLOT,
-                number_of_scenes=case['scenes'],
-                duration_per_scene=case['duration'],
-                style=case['style']
-            )
-            duration = time.time() - start_time
+            agent, scenes, duration = future.result()
 
             print(f"✅ Generated {len(scenes)} scenes in {duration:.1f}s")
 
@@ -320,7 +334,8 @@ def test_scene_structure():
         print("Generating scenes for structure validation...")
         agent = SceneDevelopmentAgentADK(model_id=DEFAULT_MODEL_ID)
 
-        scenes = agent.develop_scenes(
+        scenes = develop_scenes_cached(
+            agent,
             characters=SAMPLE_CHARACTERS,
             setting=SAMPLE_SETTING,
             plot=SAMPLE_PLOT,
@@ -367,34 +382,38 @@ def test_scene_structure():
 
 def main():
     """Run all tests."""
+    if "--no-cache" in sys.argv:
+        disable_cache()
+
     print_separator("Scene Development Agent ADK - Test Suite")
     print("Testing the 5-agent, two-phase scene development system")
     print("This will test quality validation, refinement loops, and output structure")
 
-    results = {}
+    results = []
 
     # Test 1: Sync
-    results['sync'] = test_sync_scene_development()
+    results.append(("sync", test_sync_scene_development()))
 
-    # Test 2: Async
-    results['async'] = asyncio.run(test_async_scene_development())
+    # Test 2: Async (one event loop shared by all async tests)
+    with asyncio.Runner() as runner:
+        results.append(("async", runner.run(test_async_scene_development())))
 
     # Test 3: Different scene counts
-    results['scene_counts'] = test_different_scene_counts()
+    results.append(("scene_counts", test_different_scene_counts()))
 
     # Test 4: Quality metrics
-    results['quality'] = test_quality_metrics()
+    results.append(("quality", test_quality_metrics()))
 
     # Test 5: Scene structure
-    results['structure'] = test_scene_structure()
+    results.append(("structure", test_scene_structure()))
 
     # Summary
     print_separator("Test Results Summary")
 
     total_tests = len(results)
-    passed_tests = sum(1 for result in results.values() if result)
+    passed_tests = sum(1 for _, passed in results if passed)
 
-    for test_name, passed in results.items():
+    for test_name, passed in results:
         status = "✅ PASSED" if passed else "❌ FAILED"
         print(f"{test_name.upper()}: {status}")
 
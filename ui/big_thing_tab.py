@@ -1,7 +1,6 @@
-
-import gradio as gr
-
 def big_thing_tab():
+    import gradio as gr
+
     with gr.Tab("🎊 Premiere Night"):
         with gr.Row():
             merged_video = gr.Video(label="Merged video", show_label=False, elem_id="video", height="auto")
@@ -1,7 +1,9 @@
+_STYLE_CHOICES = ("Studio Ghibli", "Anime", "Photorealistic", "Pencil Sketch", "Oil Painting", "Matte Painting")
 
-import gradio as gr
 
 def idea_tab():
+    import gradio as gr
+
     with gr.Tab("✨ The Spark"):
         with gr.Row():
             ta_idea = gr.TextArea(label="What's the Idea", lines=8,
@@ -9,7 +11,7 @@ def idea_tab():
                     The Path Engine is built from the ground up around a central, all-powerful AI. It's a perfect fit! We could also weave a powerful AI into the other concepts, but the story of a system designed for "perfect" lives feels like the strongest starting point.
                 """)
         with gr.Row():
-            dd_style = gr.Dropdown(choices=["Studio Ghibli", "Anime", "Photorealistic", "Pencil Sketch", "Oil Painting", "Matte Painting"], label="Style", interactive=True, value="Studio Ghibli")
+            dd_style = gr.Dropdown(choices=_STYLE_CHOICES, label="Style", interactive=True, value="Studio Ghibli")
         with gr.Row():
             cb_use_agent = gr.Checkbox(
                 label="🤖 Use AI Agent (Self-Critique & Refinement)",
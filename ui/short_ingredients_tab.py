@@ -1,7 +1,6 @@
-
-import gradio as gr
-
 def short_ingredients_tab():
+    import gradio as gr
+
     with gr.Tab("🎞️ The Dailies"):
         with gr.Row():
             short_ingredients=gr.Gallery(label="Generated videos", type="filepath", show_label=False, elem_id="gallery", columns=[3], rows=[4], object_fit="contain", height="auto")
@@ -1,7 +1,27 @@
+_SEX_CHOICES = ("Female", "Male", "N/A")
+_VOICE_CHOICES = ("High-pitched", "Low", "Deep", "Squeaky", "Booming")
+_STORY_MODEL_CHOICES = ("gemini-2.5-pro", "gemini-2.5-flash", "gemini-2.5-flash-preview-09-2025")
+
+
+def _build_character_row(i, visible):
+    import gradio as gr
+
+    with gr.Row(visible=visible) as row:
+        with gr.Column(scale=1):
+            img = gr.Image(label=f"Character #{i+1}", type="filepath", height=200)
+        with gr.Column(scale=3):
+            with gr.Row():
+                name = gr.Textbox(label=f"Name", placeholder=f"Character {i+1} name", interactive=True)
+                sex = gr.Dropdown(choices=_SEX_CHOICES, label="Sex", interactive=True, value="Male")
+                voice = gr.Dropdown(choices=_VOICE_CHOICES, label="Voice", interactive=True, value="Low", allow_custom_value=True)
+            with gr.Row():
+                desc = gr.TextArea(label=f"Description", placeholder=f"Character {i+1} description", lines=5, interactive=True)
+    return row, img, name, sex, voice, desc
 
-import gradio as gr
 
 def story_tab():
+    import gradio as gr
+
     with gr.Tab("🎭 The Cast"):
         # Character section
         with gr.Row():
@@ -18,22 +38,13 @@ def story_tab():
         character_descriptions = []
 
         for i in range(max_characters):
-            with gr.Row(visible=(i < sl_number_of_characters.value)) as row:
-                character_rows.append(row)
-                with gr.Column(scale=1):
-                    img = gr.Image(label=f"Character #{i+1}", type="filepath", height=200)
-                    character_images.append(img)
-                with gr.Column(scale=3):
-                    with gr.Row():
-                        name = gr.Textbox(label=f"Name", placeholder=f"Character {i+1} name", interactive=True)
-                        sex = gr.Dropdown(choices=["Female", "Male", "N/A"], label="Sex", interactive=True, value="Male")
-                        voice = gr.Dropdown(choices=["High-pitched", "Low", "Deep", "Squeaky", "Booming"], label="Voice", interactive=True, value="Low", allow_custom_value=True)
-                    with gr.Row():
-                        desc = gr.TextArea(label=f"Description", placeholder=f"Character {i+1} description", lines=5, interactive=True)
-                    character_names.append(name)
-                    character_sexs.append(sex)
-                    character_voices.append(voice)
-                    character_descriptions.append(desc)
+            row, img, name, sex, voice, desc = _build_character_row(i, visible=(i < sl_number_of_characters.value))
+            character_rows.append(row)
+            character_images.append(img)
+            character_names.append(name)
+            character_sexs.append(sex)
+            character_voices.append(voice)
+            character_descriptions.append(desc)
 
         with gr.Row():
             btn_generate_characters = gr.Button("Generate Character Images")
@@ -51,7 +62,7 @@ def story_tab():
             sl_duration_per_scene = gr.Slider(label="Duration per Scene", minimum=5, maximum=8, step=1, interactive=True, value=8)
         with gr.Row():
             dd_story_model = gr.Dropdown(
-                choices=["gemini-2.5-pro", "gemini-2.5-flash", "gemini-2.5-flash-preview-09-2025"],
+                choices=_STORY_MODEL_CHOICES,
                 label="Story Development Model",
                 interactive=True,
                 value="gemini-2.5-pro"
@@ -1,8 +1,28 @@
+_VEO_MODEL_CHOICES = ("veo-3.1-generate-preview", "veo-3.0-generate-001", "veo-3.0-fast-generate-preview", "veo-2.0-generate-001")
+_GENERATE_AUDIO_CHOICES = ("true", "false")
+
+
+def _build_scene_row(i, visible):
+    import gradio as gr
+    from handlers.ui_handlers import play_audio
+
+    with gr.Row(visible=visible) as row:
+        image = gr.Image(label=f"Scene #{i+1}", type="filepath", scale=1, interactive=True)
+        with gr.Column(scale=2):
+            text = gr.TextArea(label=f"Prompt #{i+1}", max_lines=7, interactive=True)
+            script = gr.TextArea(label=f"Script #{i+1}", max_lines=7, interactive=True)
+
+            with gr.Row():
+                audio_file_path = gr.Dropdown(label=f"Audio #{i+1}", scale=3, allow_custom_value=True, interactive=True)
+                audio_file_player = gr.Audio(type="filepath", interactive=False, scale=1)
+                audio_file_path.change(play_audio, inputs=[audio_file_path], outputs=[audio_file_player])
+    return row, image, text, script, audio_file_path, audio_file_player
 
-import gradio as gr
-from handlers.ui_handlers import play_audio, update_storyboard_visibility
 
 def visual_storyboard_tab(sl_number_of_scenes):
+    import gradio as gr
+    from handlers.ui_handlers import update_storyboard_visibility
+
     with gr.Tab("🎬 The Shoot"):
         max_scenes = 12
         storyboard_rows = []
@@ -14,20 +34,13 @@ def visual_storyboard_tab(sl_number_of_scenes):
         character_list = []
 
         for i in range(max_scenes):
-            with gr.Row(visible=(i < sl_number_of_scenes.value)) as row:
-                storyboard_rows.append(row)
-                scene_images.append(gr.Image(label=f"Scene #{i+1}", type="filepath", scale=1, interactive=True))
-                with gr.Column(scale=2):
-                    scene_texts.append(gr.TextArea(label=f"Prompt #{i+1}", max_lines=7, interactive=True))
-                    script_texts.append(gr.TextArea(label=f"Script #{i+1}", max_lines=7, interactive=True))
-
-                    with gr.Row():
-                         audio_file_path = gr.Dropdown(label=f"Audio #{i+1}", scale=3, allow_custom_value=True, interactive=True)
-                         audio_file_player = gr.Audio(type="filepath", interactive=False, scale=1)
-                         audio_file_path.change(play_audio, inputs=[audio_file_path], outputs=[audio_file_player])
-
-                         scene_audios_dropdown.append(audio_file_path)
-                         scene_audios.append(audio_file_player)
+            row, image, text, script, audio_file_path, audio_file_player = _build_scene_row(i, visible=(i < sl_number_of_scenes.value))
+            storyboard_rows.append(row)
+            scene_images.append(image)
+            scene_texts.append(text)
+            script_texts.append(script)
+            scene_audios_dropdown.append(audio_file_path)
+            scene_audios.append(audio_file_player)
 
         sl_number_of_scenes.change(
             fn=update_storyboard_visibility,
@@ -39,13 +52,13 @@ def visual_storyboard_tab(sl_number_of_scenes):
         with gr.Row():
             veo_model_id = gr.Dropdown(
                 label="Model for generating videos",
-                choices=["veo-3.1-generate-preview", "veo-3.0-generate-001", "veo-3.0-fast-generate-preview", "veo-2.0-generate-001"],
+                choices=_VEO_MODEL_CHOICES,
                 value="veo-3.1-generate-preview",
                 interactive=True
             )
             cb_generate_audio = gr.Dropdown(
                 label="Generate audio (Only for Veo3)",
-                choices=["true", "false"],
+                choices=_GENERATE_AUDIO_CHOICES,
                 value="true",
                 interactive=True
             )
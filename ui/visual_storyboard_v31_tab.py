@@ -1,8 +1,7 @@
-
-import gradio as gr
-from handlers.ui_handlers import play_audio, update_storyboard_visibility
-
 def visual_storyboard_v31_tab(sl_number_of_scenes):
+    import gradio as gr
+    from handlers.ui_handlers import play_audio, update_storyboard_visibility
+
     with gr.Tab("🎬 The Shoot (v3.1)"):
         max_scenes = 12
         storyboard_rows_v31 = []
@@ -1,49 +1,64 @@
 import base64
+import logging
 import os
 import mimetypes
+from functools import lru_cache
 from google import genai
 from google.genai import types
 from google.genai.errors import ClientError
 from models.config import GEMINI_API_KEY
+from utils.config import DEFAULT_SESSION_DIR
 from utils.logger import logger
+from utils.retry import retry_with_backoff, is_transient_genai_error
 import random
 import time
 import struct
+import re
 
-female_voices = [
+# TTS responses use a handful of MIME types; memoize the extension lookup per type
+_guess_extension = lru_cache(maxsize=16)(mimetypes.guess_extension)
+
+_MIME_PARAM_RE = re.compile(r"(?:^|;)\s*(?:audio/L(\d+)|rate=(\d+))", re.IGNORECASE)
+
+# http://soundfile.sapp.org/doc/WaveFormat/
+_WAV_HEADER_STRUCT = struct.Struct("<4sI4s4sIHHIIHH4sI")
+_WAV_HEADER_SIZE = _WAV_HEADER_STRUCT.size
+
+# Streamed TTS chunks are small; buffer them so each one doesn't cost a write() syscall
+_AUDIO_WRITE_BUFFER_SIZE = 1 << 20
+
+female_voices = (
     "Zephyr",
     "Kore",
     "Leda",
     "Aoede",
-]
+)
 
-male_voices = [
+male_voices = (
     "Puck",
     "Charon",
     "Fenrir",
     "Orus"
-]
+)
+
+_client = None
+
+def _get_client():
+    """Returns the shared Gemini client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = genai.Client(
+            api_key=GEMINI_API_KEY
+            # vertexai=True, project="cloud-llm-preview3", location="us-central1"
+        )
+    return _client
 
 def choose_random_voice(gender):
-    if gender == "female":
-        voice_name = female_voices[random.randint(0, len(female_voices) - 1)]
-    else:
-        voice_name = male_voices[random.randint(0, len(male_voices) - 1)]
-    return voice_name
-
-def save_binary_file(file_name, data):
-    file_path = f"tmp/default/{file_name}"
-    f = open(file_path, "wb")
-    f.write(data)
-    f.close()
-    return file_path
+    return random.choice(female_voices if gender == "female" else male_voices)
 
 
 def generate_audio_by_gemini(message, gender, order, character_name, start_time, voice_name, model_id="gemini-2.5-pro-preview-tts"):
-    client = genai.Client(
-        api_key=GEMINI_API_KEY
-        # vertexai=True, project="cloud-llm-preview3", location="us-central1"
-    )
+    client = _get_client()
     model = model_id
     contents = [
         types.Content(
@@ -63,60 +78,91 @@ def generate_audio_by_gemini(message, gender, order, character_name, start_time,
     logger.info(f"Generating audio: voice={voice_name}, model={model}, character={character_name}, order={order}, start_time={start_time}s")
     logger.debug(f"Audio generation message: {message[:100]}...")
 
-    file_index = 0
-    for chunk in client.models.generate_content_stream(
-        model=model,
-        contents=contents,
-        config=generate_content_config,
-    ):
-        if (
-            chunk.candidates is None
-            or chunk.candidates[0].content is None
-            or chunk.candidates[0].content.parts is None
-        ):
-            continue
-        if chunk.candidates[0].content.parts[0].inline_data and chunk.candidates[0].content.parts[0].inline_data.data:
-            # file_name = f"ENTER_FILE_NAME_{file_index}"
-            file_name = f"{order}-{character_name}-{start_time}"
-            file_index += 1
-            inline_data = chunk.candidates[0].content.parts[0].inline_data
-            data_buffer = inline_data.data
-            file_extension = mimetypes.guess_extension(inline_data.mime_type)
-            if file_extension is None:
-                file_extension = ".wav"
-                data_buffer = convert_to_wav(inline_data.data, inline_data.mime_type)
-            file_path = save_binary_file(f"{file_name}{file_extension}", data_buffer)
-            logger.info(f"Audio generated successfully: {file_name}{file_extension}")
-            return file_path
-        else:
-            logger.debug(f"Audio generation chunk text response: {chunk.text}")
+    # Transient 429/5xx failures re-run the whole stream; the output file is rewritten
+    file_path, data_size = retry_with_backoff(
+        lambda: _stream_audio_to_file(client, model, contents, generate_content_config, f"{order}-{character_name}-{start_time}"),
+        is_transient_genai_error
+    )
 
+    if file_path is not None:
+        logger.info(f"Audio generated successfully: {os.path.basename(file_path)} ({data_size} bytes)")
+    return file_path
 
 
-def convert_to_wav(audio_data: bytes, mime_type: str) -> bytes:
-    """Generates a WAV file header for the given audio data and parameters.
+def _stream_audio_to_file(client, model, contents, generate_content_config, file_name):
+    """
+    Streams a TTS response into DEFAULT_SESSION_DIR/<file_name>.<ext>.
 
-    Args:
-        audio_data: The raw audio data as a bytes object.
-        mime_type: Mime type of the audio data.
+    Every audio chunk is written straight to disk; for raw PCM a placeholder
+    header is written first and filled in once the stream completes. If the
+    stream fails, the partial file is removed rather than left looking complete.
 
     Returns:
-        A bytes object representing the WAV file header.
+        Tuple of (file path or None if no audio was returned, audio data size in bytes)
     """
+    file_path = None
+    f = None
+    is_wav = False
+    mime_type = None
+    data_size = 0
+    try:
+        for chunk in client.models.generate_content_stream(
+            model=model,
+            contents=contents,
+            config=generate_content_config,
+        ):
+            if (
+                chunk.candidates is None
+                or chunk.candidates[0].content is None
+                or chunk.candidates[0].content.parts is None
+            ):
+                continue
+            inline_data = chunk.candidates[0].content.parts[0].inline_data
+            if inline_data and inline_data.data:
+                if f is None:
+                    mime_type = inline_data.mime_type
+                    file_extension = _guess_extension(mime_type)
+                    if file_extension is None:
+                        file_extension = ".wav"
+                        is_wav = True
+                    file_path = os.path.join(DEFAULT_SESSION_DIR, f"{file_name}{file_extension}")
+                    f = open(file_path, "wb", buffering=_AUDIO_WRITE_BUFFER_SIZE)
+                    if is_wav:
+                        f.write(bytes(_WAV_HEADER_SIZE))
+                f.write(inline_data.data)
+                data_size += len(inline_data.data)
+            elif logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Audio generation chunk text response: {chunk.text}")
+    except BaseException:
+        if f is not None:
+            f.close()
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+        raise
+
+    if f is not None:
+        with f:
+            if is_wav:
+                f.seek(0)
+                f.write(_wav_header(mime_type, data_size))
+
+    return file_path, data_size
+
+
+def _wav_header(mime_type: str, data_size: int) -> bytes:
+    """Returns a PCM WAV header for data_size bytes of audio."""
     parameters = parse_audio_mime_type(mime_type)
     bits_per_sample = parameters["bits_per_sample"]
     sample_rate = parameters["rate"]
     num_channels = 1
-    data_size = len(audio_data)
     bytes_per_sample = bits_per_sample // 8
     block_align = num_channels * bytes_per_sample
     byte_rate = sample_rate * block_align
-    chunk_size = 36 + data_size  # 36 bytes for header fields before data chunk size
-
-    # http://soundfile.sapp.org/doc/WaveFormat/
+    chunk_size = _WAV_HEADER_SIZE - 8 + data_size  # header fields after ChunkSize plus data
 
-    header = struct.pack(
-        "<4sI4s4sIHHIIHH4sI",
+    return _WAV_HEADER_STRUCT.pack(
         b"RIFF",          # ChunkID
         chunk_size,       # ChunkSize (total file size - 8 bytes)
         b"WAVE",          # Format
@@ -131,7 +177,7 @@ def convert_to_wav(audio_data: bytes, mime_type: str) -> bytes:
         b"data",          # Subchunk2ID
         data_size         # Subchunk2Size (size of audio data)
     )
-    return header + audio_data
+
 
 def parse_audio_mime_type(mime_type: str) -> dict[str, int | None]:
     """Parses bits per sample and rate from an audio MIME type string.
@@ -148,21 +194,11 @@ def parse_audio_mime_type(mime_type: str) -> dict[str, int | None]:
     bits_per_sample = 16
     rate = 24000
 
-    # Extract rate from parameters
-    parts = mime_type.split(";")
-    for param in parts: # Skip the main type part
-        param = param.strip()
-        if param.lower().startswith("rate="):
-            try:
-                rate_str = param.split("=", 1)[1]
-                rate = int(rate_str)
-            except (ValueError, IndexError):
-                # Handle cases like "rate=" with no value or non-integer value
-                pass # Keep rate as default
-        elif param.startswith("audio/L"):
-            try:
-                bits_per_sample = int(param.split("L", 1)[1])
-            except (ValueError, IndexError):
-                pass # Keep bits_per_sample as default if conversion fails
+    # One pass over the ";"-separated parts, picking up "audio/L<bits>" and "rate=<hz>"
+    for match in _MIME_PARAM_RE.finditer(mime_type):
+        if match.group(1):
+            bits_per_sample = int(match.group(1))
+        elif match.group(2):
+            rate = int(match.group(2))
 
     return {"bits_per_sample": bits_per_sample, "rate": rate}
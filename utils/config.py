@@ -20,7 +20,15 @@ PLOT_TXT = os.path.join(DEFAULT_SESSION_DIR, "plot.txt")
 STORY_JSON = os.path.join(DEFAULT_SESSION_DIR, "story.json")
 MERGED_VIDEO_MP4 = os.path.join(DEFAULT_SESSION_DIR, "merged_video.mp4")
 
-# Create the directories if they don't exist
-os.makedirs(DEFAULT_SESSION_DIR, exist_ok=True)
+# LLM response caches, all off by default; set a TTL in seconds to opt in
+LLM_CACHE_DIR = os.path.join(LOCAL_STORAGE, "llm_cache")
+# Reuse of a generated story for the same or a near-identical idea. While on, generating
+# again for an idea within the TTL returns the earlier story
+SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "0"))
+# Reuse of single-shot scene development for identical inputs. While on, re-running
+# develop with unchanged inputs within the TTL returns the same scenes
+DEVELOP_STORY_CACHE_TTL_SECONDS = int(os.getenv("DEVELOP_STORY_CACHE_TTL_SECONDS", "0"))
+
+# Create the directories if they don't exist (makedirs also creates DEFAULT_SESSION_DIR)
 os.makedirs(CHARACTERS_DIR, exist_ok=True)
 os.makedirs(VIDEOS_DIR, exist_ok=True)
@@ -1,12 +1,51 @@
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from google import genai
 from google.genai import types
+from PIL import Image
 from models.config import GEMINI_API_KEY
 from utils.logger import logger
+from utils.retry import retry_with_backoff, is_transient_genai_error
+
+# Reference images don't need more detail than the model's input resolution
+_REFERENCE_IMAGE_DRAFT_SIZE = (1024, 1024)
+
+_VALID_ASPECT_RATIOS = frozenset({"1:1", "2:3", "3:2", "4:3", "5:4", "9:16", "16:9", "21:9"})
+
+# Gemini clients keyed by API version, created on first use and reused across calls
+_clients = {}
+
+def _get_client(api_version=None):
+    """Returns the shared Gemini client for the given API version."""
+    client = _clients.get(api_version)
+    if client is None:
+        http_options = {'api_version': api_version} if api_version else None
+        client = genai.Client(api_key=GEMINI_API_KEY, http_options=http_options)
+        _clients[api_version] = client
+    return client
+
+@lru_cache(maxsize=32)
+def _load_reference_image(path, mtime):
+    """
+    Decodes a reference image file, converting to RGB if the API may not accept its mode.
+
+    Cached by (path, mtime) because the same character references are reused for
+    every scene of a story. Callers must not mutate the returned image.
+    """
+    img = Image.open(path)
+    # Let the JPEG decoder downscale while decoding; a no-op for other formats
+    img.draft('RGB', _REFERENCE_IMAGE_DRAFT_SIZE)
+    # Convert to RGB if needed (API might not accept RGBA or other modes)
+    if img.mode not in ['RGB', 'L']:
+        logger.debug(f"Converting reference image {path} from {img.mode} to RGB")
+        img = img.convert('RGB')
+    img.load()
+    return img
 
 def gen_images(model_id, prompt, negative_prompt, number_of_images, aspect_ratio, is_enhance):
-    client = genai.Client(api_key=GEMINI_API_KEY, http_options={'api_version': 'v1'})
+    client = _get_client('v1')
     logger.info(f"Image generation: model={model_id}, count={number_of_images}, aspect_ratio={aspect_ratio}, enhance={is_enhance}")
     logger.debug(f"Prompt: {prompt}, negative_prompt: {negative_prompt}")
     if is_enhance=="yes":
@@ -14,16 +53,19 @@ def gen_images(model_id, prompt, negative_prompt, number_of_images, aspect_ratio
     else:
         enhance_prompt = False
 
-    response = client.models.generate_images(
-        model=model_id,
-        prompt=prompt,
-        config=types.GenerateImagesConfig(
-            # negative_prompt =negative_prompt,
-            number_of_images= number_of_images,
-            aspect_ratio = aspect_ratio,
-            # enhance_prompt=enhance_prompt,
-            person_generation = "ALLOW_ADULT"
-        )
+    response = retry_with_backoff(
+        lambda: client.models.generate_images(
+            model=model_id,
+            prompt=prompt,
+            config=types.GenerateImagesConfig(
+                # negative_prompt =negative_prompt,
+                number_of_images= number_of_images,
+                aspect_ratio = aspect_ratio,
+                # enhance_prompt=enhance_prompt,
+                person_generation = "ALLOW_ADULT"
+            )
+        ),
+        is_transient_genai_error
     )
     return response.generated_images
 
@@ -58,14 +100,10 @@ def gen_images_by_banana(prompt, negative_prompt="", number_of_images=1, aspect_
         >>> img = Image.open(BytesIO(images[0]))
         >>> img.save("output.png")
     """
-    from PIL import Image
-    from io import BytesIO
-
-    client = genai.Client(api_key=GEMINI_API_KEY)
+    client = _get_client()
 
     # Validate aspect ratio
-    valid_aspect_ratios = ["1:1", "2:3", "3:2", "4:3", "5:4", "9:16", "16:9", "21:9"]
-    if aspect_ratio not in valid_aspect_ratios:
+    if aspect_ratio not in _VALID_ASPECT_RATIOS:
         logger.warning(f"Invalid aspect ratio '{aspect_ratio}'. Using '1:1' instead.")
         aspect_ratio = "1:1"
 
@@ -83,12 +121,8 @@ def gen_images_by_banana(prompt, negative_prompt="", number_of_images=1, aspect_
                     if not os.path.exists(ref_img):
                         logger.error(f"Reference image file does not exist: {ref_img}")
                         continue
-                    # Load the image
-                    img = Image.open(ref_img)
-                    # Convert to RGB if needed (API might not accept RGBA or other modes)
-                    if img.mode not in ['RGB', 'L']:
-                        logger.debug(f"Converting reference image {idx+1} from {img.mode} to RGB")
-                        img = img.convert('RGB')
+                    # Load the image (decoded once per file version, see _load_reference_image)
+                    img = _load_reference_image(ref_img, os.path.getmtime(ref_img))
                     processed_ref_images.append(img)
                     logger.debug(f"Loaded reference image {idx+1}: {ref_img} ({img.size}, {img.mode})")
                 elif isinstance(ref_img, Image.Image):
@@ -112,26 +146,26 @@ def gen_images_by_banana(prompt, negative_prompt="", number_of_images=1, aspect_
     logger.info(f"Generating image with Gemini 2.5 Flash Image model: aspect_ratio={aspect_ratio}, reference_images={len(processed_ref_images)}")
     logger.debug(f"Full prompt: {full_prompt}")
 
-    generated_images = []
+    # Add aspect ratio instruction to the prompt since ImageConfig doesn't exist
+    prompt_with_ratio = f"{full_prompt}\n\nGenerate the image with aspect ratio {aspect_ratio}."
 
-    # Generate images (one at a time since Gemini doesn't support batch generation)
-    for i in range(number_of_images):
+    # Build contents list once: reference images first, then text prompt
+    contents = [*processed_ref_images, prompt_with_ratio]
+
+    def _one(i):
         try:
-            # Add aspect ratio instruction to the prompt since ImageConfig doesn't exist
-            prompt_with_ratio = f"{full_prompt}\n\nGenerate the image with aspect ratio {aspect_ratio}."
-
-            # Build contents list: reference images first, then text prompt
-            contents = processed_ref_images + [prompt_with_ratio]
-
-            response = client.models.generate_content(
-                model="gemini-2.5-flash-image",
-                contents=contents,
-                config=types.GenerateContentConfig(
-                    response_modalities=['Image'],  # Only return image
-                    image_config=types.ImageConfig(
-                        aspect_ratio=aspect_ratio
+            response = retry_with_backoff(
+                lambda: client.models.generate_content(
+                    model="gemini-2.5-flash-image",
+                    contents=contents,
+                    config=types.GenerateContentConfig(
+                        response_modalities=['Image'],  # Only return image
+                        image_config=types.ImageConfig(
+                            aspect_ratio=aspect_ratio
+                        )
                     )
-                )
+                ),
+                is_transient_genai_error
             )
 
             # Extract image data from response
@@ -142,14 +176,23 @@ def gen_images_by_banana(prompt, negative_prompt="", number_of_images=1, aspect_
             ]
 
             if image_parts:
-                generated_images.append(image_parts[0])
                 logger.info(f"Successfully generated image {i+1}/{number_of_images}")
-            else:
-                logger.warning(f"No image data in response for image {i+1}/{number_of_images}")
+                return image_parts[0]
+            logger.warning(f"No image data in response for image {i+1}/{number_of_images}")
+            return None
 
         except Exception as e:
             logger.error(f"Image generation failed {i+1}/{number_of_images}: {str(e)}")
             raise Exception(f"Gemini image generation failed: {str(e)}")
 
+    # Gemini returns one image per request, so issue the requests concurrently
+    if number_of_images <= 1:
+        results = [_one(i) for i in range(number_of_images)]
+    else:
+        with ThreadPoolExecutor(max_workers=min(number_of_images, 4)) as executor:
+            results = list(executor.map(_one, range(number_of_images)))
+
+    generated_images = [image for image in results if image is not None]
+
     return generated_images
 
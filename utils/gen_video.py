@@ -4,23 +4,35 @@ Video generation utilities using Google's Veo 2.0 model.
 
 import time
 import os
+import random
 import base64
 import uuid
+from functools import lru_cache
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Tuple, Any
 import google.auth
 import google.auth.transport.requests
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
 import subprocess
-import tempfile
 import json
+import logging
+from fractions import Fraction
 
 from utils.llm import call_llm
 from models.config import VEO_PROJECT_ID, LOCAL_STORAGE, VEO_STORAGE_BUCKET, PROJECT_ID
 from utils.acceptance import to_snake_case
 from models.exceptions import APIError, StorageError, FileUploadError
 
+from utils import json_compat
 from utils.logger import logger
+from utils.video_encoder import h264_encoder_args
 
 
 
@@ -29,16 +41,102 @@ video_model = f"https://us-central1-aiplatform.googleapis.com/v1beta1/projects/{
 
 # Constants
 VIDEO_GENERATION_TIMEOUT = 300  # 5 minutes
-POLLING_INTERVAL = 10
-MAX_RETRIES = 30
-
+POLLING_BASE_DELAY = 1.5  # first poll delay, doubled on each attempt
+POLLING_MAX_DELAY = 15
+POLLING_JITTER = 1.0
+REQUEST_TIMEOUT = (5, 30)  # (connect, read) seconds
+PARALLEL_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # files larger than this are uploaded in parallel chunks
+PARALLEL_UPLOAD_WORKERS = 8
+CYCLIC_FADE_SECONDS = 0.25  # crossfade back to the first frame in make_video_cyclic
+FFMPEG_STDERR_TAIL_LINES = 200
+
+# Per-model capabilities; Veo 2.0 has no audio generation but accepts a last frame
+_MODEL_CAPS = {
+    "veo-2.0-generate-001": {"audio": False, "last_frame": True},
+    "veo-3.0-generate-001": {"audio": True, "last_frame": False},
+    "veo-3.0-fast-generate-preview": {"audio": True, "last_frame": False},
+    "veo-3.1-generate-preview": {"audio": True, "last_frame": False},
+    "veo-3.1-fast-generate-preview": {"audio": True, "last_frame": False},
+}
+
+@lru_cache(maxsize=16)
+def _model_caps(model_id: str) -> Dict[str, bool]:
+    """Returns the capabilities of a Veo model, inferring them from the version for unlisted ids."""
+    caps = _MODEL_CAPS.get(model_id)
+    if caps is None:
+        is_veo2 = "2.0" in model_id
+        caps = {"audio": not is_veo2, "last_frame": is_veo2}
+    return caps
+
+def _make_session(retry: Retry) -> requests.Session:
+    """Returns an HTTP session with pooled connections and the given retry policy."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry))
+    return session
+
+# Shared HTTP sessions so repeated Vertex AI calls (LRO polling in particular) reuse connections.
+# POST is not retried by default, so each session opts in as far as its calls are safe to repeat.
+# Submitting a job (predictLongRunning) is not idempotent: a resend after a 5xx or read timeout
+# may start and bill a second generation, so only rejected (429) and unsent (connect) requests retry.
+_submit_session = _make_session(Retry(
+    total=5,
+    connect=5,
+    read=0,
+    status=5,
+    backoff_factor=0.8,
+    status_forcelist=[429],
+    allowed_methods={"POST"},
+    respect_retry_after_header=True
+))
+# Polling an operation (fetchPredictOperation) is read-only, so transient failures retry freely
+_poll_session = _make_session(Retry(
+    total=5,
+    backoff_factor=0.8,
+    status_forcelist=[408, 429, 500, 502, 503, 504],
+    allowed_methods={"POST"},
+    respect_retry_after_header=True
+))
+
+# Lazily created GCS client and ADC credentials, shared across calls
+_storage_client: Optional[storage.Client] = None
+_creds = None
+_auth_lock = threading.Lock()
+TOKEN_REFRESH_MARGIN = timedelta(seconds=300)
+
+def _get_storage_client() -> storage.Client:
+    """Returns the shared GCS client, creating it on first use."""
+    global _storage_client
+    if _storage_client is None:
+        with _auth_lock:
+            if _storage_client is None:
+                _storage_client = storage.Client(project=PROJECT_ID)
+    return _storage_client
+
+def _get_access_token() -> str:
+    """Returns a cached ADC access token, refreshing it only when close to expiry."""
+    global _creds
+    with _auth_lock:
+        if _creds is None:
+            _creds, _ = google.auth.default()
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # google-auth uses naive UTC
+        if not _creds.token or _creds.expiry is None or _creds.expiry - now < TOKEN_REFRESH_MARGIN:
+            _creds.refresh(google.auth.transport.requests.Request())
+        return _creds.token
+
+@lru_cache(maxsize=16)
 def prediction_endpoint(model_id: str) -> str:
     return f"{video_model}/{model_id}:predictLongRunning"
 
+@lru_cache(maxsize=16)
 def fetch_endpoint(model_id: str) -> str:
     return f"{video_model}/{model_id}:fetchPredictOperation"
 
-def upload_local_file_to_gcs(bucket_name: str, sub_folder: str, local_file_path: str) -> str:
+def upload_local_file_to_gcs(
+    bucket_name: str,
+    sub_folder: str,
+    local_file_path: str,
+    blob_name: Optional[str] = None
+) -> str:
     """
     Uploads a local file to Google Cloud Storage.
 
@@ -46,6 +144,7 @@ def upload_local_file_to_gcs(bucket_name: str, sub_folder: str, local_file_path:
         bucket_name: Name of the GCS bucket
         sub_folder: Subfolder path in the bucket
         local_file_path: Path to the local file
+        blob_name: Optional precomputed object name; defaults to the snake-cased file name
 
     Returns:
         The GCS URI of the uploaded file
@@ -54,14 +153,23 @@ def upload_local_file_to_gcs(bucket_name: str, sub_folder: str, local_file_path:
         StorageError: If the upload operation fails
     """
     try:
-        client = storage.Client(project=PROJECT_ID)
-        bucket = client.bucket(bucket_name)
+        bucket = _get_storage_client().bucket(bucket_name)
 
-        blob_name = to_snake_case(local_file_path.split("/")[-1])
+        if blob_name is None:
+            blob_name = to_snake_case(os.path.basename(local_file_path))
         if sub_folder:
             blob_name = f"{sub_folder}/{blob_name}"
         blob = bucket.blob(blob_name)
-        blob.upload_from_filename(local_file_path)
+        if os.path.getsize(local_file_path) > PARALLEL_UPLOAD_CHUNK_SIZE:
+            transfer_manager.upload_chunks_concurrently(
+                local_file_path,
+                blob,
+                chunk_size=PARALLEL_UPLOAD_CHUNK_SIZE,
+                max_workers=PARALLEL_UPLOAD_WORKERS,
+                worker_type=transfer_manager.THREAD
+            )
+        else:
+            blob.upload_from_filename(local_file_path)
         gcs_uri = f"gs://{bucket_name}/{blob_name}"
         logger.info(f"File {local_file_path} uploaded to {gcs_uri}")
         return gcs_uri
@@ -94,13 +202,19 @@ def upload_image(input_image_path: str, whoami: str) -> str:
         logger.error(f"Failed to upload image: {str(e)}")
         raise FileUploadError(f"Failed to upload image: {str(e)}")
     
-def send_request_to_google_api(api_endpoint: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def send_request_to_google_api(
+    api_endpoint: str,
+    data: Optional[Dict[str, Any]] = None,
+    session: Optional[requests.Session] = None
+) -> Dict[str, Any]:
     """
     Sends an HTTP request to a Google API endpoint.
 
     Args:
         api_endpoint: The URL of the Google API endpoint.
         data: Optional dictionary of data to send in the request body.
+        session: Session to send with; defaults to the submit session, which never
+            resends a request the server may have already processed.
 
     Returns:
         The response from the Google API.
@@ -109,20 +223,18 @@ def send_request_to_google_api(api_endpoint: str, data: Optional[Dict[str, Any]]
         APIError: If the API request fails.
     """
     try:
-        # Get access token calling API
-        creds, _ = google.auth.default()
-        auth_req = google.auth.transport.requests.Request()
-        creds.refresh(auth_req)
-        access_token = creds.token
+        access_token = _get_access_token()
 
         headers = {
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json",
         }
 
-        response = requests.post(api_endpoint, headers=headers, json=data)
+        body = None if data is None else json_compat.dumps(data)
+
+        response = (session or _submit_session).post(api_endpoint, headers=headers, data=body, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return json_compat.loads(response.content)
     except requests.exceptions.RequestException as e:
         logger.error(f"API request failed: {str(e)}")
         raise APIError(f"Failed to send request to Google API: {str(e)}")
@@ -159,20 +271,25 @@ def compose_veo31_request(
         "prompt": prompt,
         "referenceImages": referenceImages
     }
+    parameters = {
+        "aspectRatio": aspect_ratio,
+        "negativePrompt": negative_prompt,
+        "personGeneration": person_generation,
+        "resolution": resolution,
+        "storageUri": output_gcs_uri,
+        "sampleCount": sample_count,
+        "seed": seed,
+        "durationSeconds": duration_seconds
+    }
+
+    # Conditionally add generateAudio
+    if generate_audio:
+        parameters["generateAudio"] = generate_audio.lower() == "true"
+
     return {
-            "instances": [instance],
-            "parameters": {
-                "aspectRatio": aspect_ratio,
-                "negativePrompt": negative_prompt,
-                "personGeneration": person_generation,
-                "resolution": resolution,
-                "storageUri": output_gcs_uri,
-                "sampleCount": sample_count,
-                "seed": seed,
-                "durationSeconds": duration_seconds,
-                "generateAudio": generate_audio.lower() == "true"
-            },
-        }
+        "instances": [instance],
+        "parameters": parameters
+    }
 
 
 def compose_videogen_request(
@@ -261,8 +378,8 @@ def _execute_video_generation(
     Raises:
         APIError: If the API request fails
     """
-    if log_request:
-        logger.info(f"Composed request: {json.dumps(request, indent=4)}")
+    if log_request and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Composed request: {json.dumps(request)}")
 
     resp = send_request_to_google_api(prediction_endpoint(model_id), request)
     logger.info(f"Received initial response for operation: {resp}")
@@ -270,13 +387,16 @@ def _execute_video_generation(
     r_resp = fetch_operation(model_id, resp["name"])
     return r_resp, {"req": request, "resp": r_resp}
 
-def fetch_operation(model_id: str, lro_name: str, itr: int = MAX_RETRIES) -> Dict[str, Any]:
+def fetch_operation(model_id: str, lro_name: str, timeout: float = VIDEO_GENERATION_TIMEOUT) -> Dict[str, Any]:
     """
     Fetches the status of a long-running operation.
 
+    Polls densely at first, then backs off exponentially (with jitter) up to
+    POLLING_MAX_DELAY so short jobs are detected quickly and long jobs need fewer calls.
+
     Args:
         lro_name: Name of the long-running operation
-        itr: Maximum number of iterations to wait
+        timeout: Maximum number of seconds to wait
 
     Returns:
         Operation response from Google API
@@ -285,18 +405,26 @@ def fetch_operation(model_id: str, lro_name: str, itr: int = MAX_RETRIES) -> Dic
         APIError: If the operation fails or times out
     """
     request = {"operationName": lro_name}
-    for i in range(itr):
+    start = time.monotonic()
+    attempt = 0
+    while True:
         try:
-            resp = send_request_to_google_api(fetch_endpoint(model_id), request)
+            resp = send_request_to_google_api(fetch_endpoint(model_id), request, _poll_session)
             if "done" in resp and resp["done"]:
                 logger.info(f"Operation {lro_name} completed successfully")
                 return resp
-            time.sleep(POLLING_INTERVAL)
         except APIError as e:
             logger.error(f"Error fetching operation {lro_name}: {str(e)}")
             raise
-    
-    raise APIError(f"Operation {lro_name} timed out after {itr * POLLING_INTERVAL} seconds")
+
+        remaining = timeout - (time.monotonic() - start)
+        if remaining <= 0:
+            break
+        delay = min(POLLING_MAX_DELAY, POLLING_BASE_DELAY * 2 ** attempt) + random.uniform(0, POLLING_JITTER)
+        time.sleep(min(delay, remaining))
+        attempt += 1
+
+    raise APIError(f"Operation {lro_name} timed out after {timeout} seconds")
 
 def text_to_video(
     model_id: str,
@@ -339,8 +467,7 @@ def text_to_video(
     logger.info(f"model_id: {model_id}")
     logger.info(f"Starting text-to-video generation with prompt: {prompt}")
 
-    # Veo 2.0 doesn't support audio generation
-    if "2.0" in model_id:
+    if not _model_caps(model_id)["audio"]:
         generate_audio = None
 
     req = compose_videogen_request(
@@ -425,16 +552,13 @@ def image_to_video(
     logger.info(f"model_id: {model_id}")
     logger.info(f"Starting image-to-video generation with prompt: {prompt}")
 
-    # Determine last frame image and audio settings based on model version
-    last_frame = None
-    if "2.0" in model_id:
-        logger.info(f"image_gcs: {image_gcs}")
-        logger.info(f"image_gcs_last: {image_gcs_last}")
-        # Veo 2.0 doesn't support audio generation
+    # Determine last frame image and audio settings based on model capabilities
+    caps = _model_caps(model_id)
+    if not caps["audio"]:
         generate_audio = None
-        # Only use last frame if provided and not empty
-        if image_gcs_last and image_gcs_last != "":
-            last_frame = image_gcs_last
+    # Empty string means no last frame
+    last_frame = (image_gcs_last or None) if caps["last_frame"] else None
+    logger.info(f"image_gcs: {image_gcs}, last_frame: {last_frame}")
 
     # Single request composition
     req = compose_videogen_request(
@@ -455,9 +579,8 @@ def copy_gcs_file_to_local(gcs_uri: str, local_file_path: str) -> None:
         StorageError: If the file copy operation fails
     """
     try:
-        client = storage.Client(project=os.getenv("PROJECT_ID"))
         bucket_name, blob_name = gcs_uri.replace("gs://", "").split("/", 1)
-        bucket = client.bucket(bucket_name)
+        bucket = _get_storage_client().bucket(bucket_name)
         blob = bucket.blob(blob_name)
         blob.download_to_filename(local_file_path)
         logger.info(f"File {gcs_uri} copied to {local_file_path}")
@@ -480,36 +603,54 @@ def download_videos(op: Dict[str, Any], whoami: str, seqence: str, loop_seamless
     Raises:
         StorageError: If video download fails
     """
-    logger.info("--------------------------------")
-    logger.info(f"op: {op}")
-    logger.info("--------------------------------")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"op: {json.dumps(op)}")
     logger.info(f"Starting video download for user: {whoami}")
     local_path = f"{LOCAL_STORAGE}/{whoami}/videos"
     logger.info(f"local_path: {local_path}")
 
-    if not os.path.exists(local_path):
-        os.makedirs(local_path)
- 
+    os.makedirs(local_path, exist_ok=True)
+
     l_files = []
     if op.get("error") is None:
         if op["response"]:
             if op["response"].get("raiMediaFilteredReasons") is None:
-                logger.info(f"op['response']['videos']: {op['response']['videos']}")
-                for video in op["response"]["videos"]:
+                videos = op["response"]["videos"]
+                logger.info(f"Downloading {len(videos)} generated video(s)")
+                targets = []
+                for video in videos:
                     gcs_uri = video["gcsUri"]
-                    file_name = f"{local_path}/{seqence}-{str(uuid.uuid4())}-" + gcs_uri.split("/")[-1]
-                    file_name_loop_seamless = f"{local_path}/{seqence}-{str(uuid.uuid4())}-loop_seamless-" + gcs_uri.split("/")[-1]
-                    try:
-                        copy_gcs_file_to_local(gcs_uri, file_name)
-                        
-                        if loop_seamless:
-                            make_video_cyclic(file_name, file_name_loop_seamless)
-                            l_files.append(file_name_loop_seamless)
-                        else:
-                            l_files.append(file_name)
-                    except StorageError as e:
-                        logger.error(f"Failed to download video: {str(e)}")
+                    basename = gcs_uri.rsplit("/", 1)[-1]
+                    uid = uuid.uuid4().hex
+                    prefix = os.path.join(local_path, f"{seqence}-{uid}-")
+                    file_name = f"{prefix}{basename}"
+                    file_name_loop_seamless = f"{prefix}loop_seamless-{basename}"
+                    targets.append((gcs_uri, file_name, file_name_loop_seamless))
+
+                # Downloads are latency-bound, so fetch all videos concurrently
+                downloaded = set()
+                if targets:
+                    with ThreadPoolExecutor(max_workers=min(8, len(targets))) as executor:
+                        futures = {
+                            executor.submit(copy_gcs_file_to_local, gcs_uri, file_name): file_name
+                            for gcs_uri, file_name, _ in targets
+                        }
+                        for future in as_completed(futures):
+                            try:
+                                future.result()
+                                downloaded.add(futures[future])
+                            except StorageError as e:
+                                logger.error(f"Failed to download video: {str(e)}")
+
+                # ffmpeg post-processing stays serial, in the original video order
+                for _, file_name, file_name_loop_seamless in targets:
+                    if file_name not in downloaded:
                         continue
+                    if loop_seamless:
+                        make_video_cyclic(file_name, file_name_loop_seamless)
+                        l_files.append(file_name_loop_seamless)
+                    else:
+                        l_files.append(file_name)
     return l_files
 
 def random_video_prompt() -> str:
@@ -566,10 +707,22 @@ def rewrite_video_prompt(prompt: str) -> str:
         history=""
     )
 
+def _run_ffmpeg(cmd: List[str]) -> None:
+    """
+    Runs an ffmpeg command, discarding stdout and keeping only the tail of stderr.
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg exits with a non-zero status
+    """
+    with subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True) as proc:
+        stderr_tail = deque(proc.stderr, maxlen=FFMPEG_STDERR_TAIL_LINES)
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr="".join(stderr_tail))
+
 def make_video_cyclic(input_video_path, output_video_path):
     """
-    Creates a seamlessly looping video by appending the first frame to the end.
-    Uses FFmpeg directly for reliable video processing with smooth transition.
+    Creates a seamlessly looping video by crossfading the first frame back in at the end.
+    Uses a single FFmpeg filtergraph, so the video is decoded and encoded only once.
 
     Args:
         input_video_path (str): Path to the input video file
@@ -583,87 +736,49 @@ def make_video_cyclic(input_video_path, output_video_path):
         # Create output directory if it doesn't exist
         os.makedirs(os.path.dirname(os.path.abspath(output_video_path)), exist_ok=True)
 
-        # Create a temporary directory for intermediate files
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # 1. Get video information for frame rate
-            probe_cmd = [
-                'ffprobe',
-                '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_streams',
-                '-select_streams', 'v:0',
-                input_video_path
-            ]
-            result = subprocess.run(probe_cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                raise subprocess.CalledProcessError(
-                    result.returncode, probe_cmd,
-                    output=result.stdout, stderr=result.stderr
-                )
-            
-            video_info = json.loads(result.stdout)
-            fps = eval(video_info['streams'][0]['r_frame_rate'])
-
-            # 2. Extract the first frame
-            first_frame_path = os.path.join(temp_dir, "first_frame.png")
-            logger.info(f"first_frame_path: {first_frame_path}")
-            extract_cmd = [
-                'ffmpeg', '-y',
-                '-i', os.path.abspath(input_video_path),
-                '-vframes', '1',
-                '-f', 'image2',
-                first_frame_path
-            ]
-            result = subprocess.run(extract_cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                raise subprocess.CalledProcessError(
-                    result.returncode, extract_cmd, 
-                    output=result.stdout, stderr=result.stderr
-                )
-
-            # 3. Create a frame video with proper duration
-            frame_video_path = os.path.join(temp_dir, "frame.mp4")
-            frame_cmd = [
-                'ffmpeg', '-y',
-                '-loop', '1',
-                '-i', first_frame_path,
-                '-t', '0.25',  # Duration of 0.25 seconds for smoother transition
-                '-r', str(fps),  # Match original frame rate
-                '-c:v', 'libx264',
-                '-pix_fmt', 'yuv420p',
-                frame_video_path
-            ]
-            result = subprocess.run(frame_cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                raise subprocess.CalledProcessError(
-                    result.returncode, frame_cmd,
-                    output=result.stdout, stderr=result.stderr
-                )
-
-            # 4. Create final video with crossfade transition
-            concat_cmd = [
-                'ffmpeg', '-y',
-                '-i', input_video_path,
-                '-i', frame_video_path,
-                '-filter_complex',
-                f'[0:v][1:v]xfade=transition=fade:duration=0.25:offset={max(0, float(video_info["streams"][0]["duration"]) - 0.25)}[v]',
-                '-map', '[v]',
-                '-c:v', 'libx264',
-                '-preset', 'medium',
-                '-profile:v', 'high',
-                '-pix_fmt', 'yuv420p',
-                '-movflags', '+faststart',
-                '-r', str(fps),  # Maintain original frame rate
-                output_video_path
-            ]
-            result = subprocess.run(concat_cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                raise subprocess.CalledProcessError(
-                    result.returncode, concat_cmd,
-                    output=result.stdout, stderr=result.stderr
-                )
-
-            logger.info(f"Successfully created smooth cyclic video: {output_video_path}")
+        # 1. Get video information for frame rate and duration
+        probe_cmd = [
+            'ffprobe',
+            '-v', 'quiet',
+            '-print_format', 'json',
+            '-show_streams',
+            '-select_streams', 'v:0',
+            input_video_path
+        ]
+        result = subprocess.run(probe_cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise subprocess.CalledProcessError(
+                result.returncode, probe_cmd,
+                output=result.stdout, stderr=result.stderr
+            )
+
+        stream_info = json.loads(result.stdout)['streams'][0]
+        fps = float(Fraction(stream_info['r_frame_rate']))
+        offset = max(0, float(stream_info['duration']) - CYCLIC_FADE_SECONDS)
+
+        # 2. Hold the first frame for the fade duration and crossfade it over the end,
+        #    all in one pass without writing intermediate frames or clips to disk
+        filter_graph = (
+            f"[0:v]split[main][head];"
+            f"[head]trim=end_frame=1,setpts=PTS-STARTPTS,"
+            f"tpad=stop_mode=clone:stop_duration={CYCLIC_FADE_SECONDS},"
+            f"trim=duration={CYCLIC_FADE_SECONDS}[loop];"
+            f"[main][loop]xfade=transition=fade:duration={CYCLIC_FADE_SECONDS}:offset={offset},"
+            f"format=yuv420p[v]"
+        )
+        cyclic_cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error', '-nostats',
+            '-i', input_video_path,
+            '-filter_complex', filter_graph,
+            '-map', '[v]',
+            *h264_encoder_args(),
+            '-movflags', '+faststart',
+            '-r', str(fps),  # Maintain original frame rate
+            output_video_path
+        ]
+        _run_ffmpeg(cyclic_cmd)
+
+        logger.info(f"Successfully created smooth cyclic video: {output_video_path}")
 
     except subprocess.CalledProcessError as e:
         logger.error(f"FFmpeg error:\nCommand: {' '.join(e.cmd)}\nOutput: {e.output}\nError: {e.stderr}")
@@ -0,0 +1,31 @@
+"""
+JSON encoding and decoding backed by orjson when it is installed.
+
+orjson ships with gradio, so it is normally present; the stdlib json module is
+used otherwise. Decode errors are json.JSONDecodeError either way, since
+orjson.JSONDecodeError subclasses it.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parses a JSON document from str or UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Serializes obj to UTF-8 JSON bytes, indented by two spaces when pretty, compact otherwise."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -4,7 +4,8 @@ LLM (Large Language Model) utilities for text generation using Google's Gemini m
 
 import json
 import logging
-from typing import Optional, List, Dict, Any
+import re
+from typing import Optional, List, Dict, Any, Tuple
 
 from google import genai
 from google.genai import types
@@ -12,6 +13,7 @@ from google.genai import types
 from models.config import DEFAULT_MODEL_ID, GEMINI_API_KEY
 from models.exceptions import APIError, ValidationError
 
+from utils import json_compat
 from utils.logger import logger
 
 # Constants
@@ -20,6 +22,34 @@ TOP_P = 0.95
 TOP_K = 64
 MAX_OUTPUT_TOKENS = 65536
 
+# Markdown code fence at either end of an LLM response, e.g. ```json ... ```
+_FENCE_RE = re.compile(r'^\s*```(?:\s*json)?\s*|\s*```\s*$', re.IGNORECASE)
+_JSON_DECODER = json.JSONDecoder()
+
+def _decode_pjson(json_string: str) -> Tuple[str, Any]:
+    """
+    Strips code fences from json_string and decodes the JSON value it holds.
+
+    An object or array may be followed by trailing text, which is dropped;
+    a bare scalar must make up the whole string.
+
+    Returns:
+        Tuple of (cleaned JSON string, parsed value)
+
+    Raises:
+        json.JSONDecodeError: If no JSON value can be decoded
+    """
+    json_str = _FENCE_RE.sub("", json_string).strip()
+    # Fast path for the common case where the whole string is one JSON value
+    try:
+        return json_str, json_compat.loads(json_str)
+    except json.JSONDecodeError:
+        pass
+    obj, end = _JSON_DECODER.raw_decode(json_str)
+    if end != len(json_str) and not isinstance(obj, (dict, list)):
+        raise json.JSONDecodeError("Extra data", json_str, end)
+    return json_str[:end], obj
+
 def string_to_pjson(json_string: str) -> Optional[str]:
     """
     Converts a JSON string to a properly formatted JSON string.
@@ -33,20 +63,32 @@ def string_to_pjson(json_string: str) -> Optional[str]:
     Raises:
         ValidationError: If the input string is empty or invalid
     """
+    parsed = _parse_pjson(json_string)
+    return parsed[0] if parsed else None
+
+def parse_pjson(json_string: str) -> Optional[Any]:
+    """
+    Like string_to_pjson, but returns the parsed JSON value instead of the string.
+
+    Args:
+        json_string: Input JSON string that may contain markdown code block markers
+
+    Returns:
+        Parsed JSON value or None if invalid
+
+    Raises:
+        ValidationError: If the input string is empty or invalid
+    """
+    parsed = _parse_pjson(json_string)
+    return parsed[1] if parsed else None
+
+def _parse_pjson(json_string: str) -> Optional[Tuple[str, Any]]:
+    """Returns (cleaned JSON string, parsed value), or None if json_string is not JSON."""
     if not json_string or not isinstance(json_string, str):
         raise ValidationError("Input must be a non-empty string")
 
     try:
-        # Remove the ```json and ``` markers
-        json_str = json_string.strip()
-        markers = ["```json", "``` JSON", "```"]
-        for marker in markers:
-            json_str = json_str.replace(marker, "")
-        json_str = json_str.strip()
-        
-        # Validate JSON
-        json.loads(json_str)
-        return json_str
+        return _decode_pjson(json_string)
     except json.JSONDecodeError as e:
         logger.debug(f"Response is not JSON format: {str(e)}")
         return None
@@ -140,6 +182,3 @@ def call_llm(
     except Exception as e:
         logger.error(f"Error in LLM call: {str(e)}")
         raise APIError(f"Failed to generate content: {str(e)}")
-
-
-
@@ -2,8 +2,11 @@
 Logging configuration for the media generation application.
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 from datetime import datetime
 
 # Create logs directory if it doesn't exist
@@ -29,6 +32,17 @@ formatter = logging.Formatter(
 file_handler.setFormatter(formatter)
 console_handler.setFormatter(formatter)
 
+# Handlers run on a background listener thread; callers only enqueue records
+log_queue = queue.Queue(-1)
+listener = logging.handlers.QueueListener(
+    log_queue,
+    # file_handler,
+    console_handler,
+    respect_handler_level=True
+)
+listener.start()
+atexit.register(listener.stop)
+
 # Add handlers to logger
-# logger.addHandler(file_handler)
-logger.addHandler(console_handler) 
\ No newline at end of file
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+ 
\ No newline at end of file
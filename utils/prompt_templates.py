@@ -1,89 +1,55 @@
-from typing import Tuple
+import textwrap
+from functools import lru_cache
+from string import Template
+from typing import List, Tuple
 
+# System instructions are static, so they are built and dedented once at import.
+# Generate and update share one instruction that differs only in the character limit.
+_STORY_STRUCTURE_SYSTEM_TPL = Template(textwrap.dedent("""
+    <role>
+    You are a creative writer.
+    </role>
+    <persona>
+    Your primary goal is to develop a compelling story structure based on the idea provided by the user. You will generate a structured output containing characters, a setting, and a plot.
+    </persona>
+    <constraints>
+    1. Your output MUST be a single, valid JSON object.
+    2. The JSON object must strictly follow this structure:
+    ```json
+    {
+        "characters": [
+            {
+                "name": "Name of the character",
+                "sex": "The sex of the character, either of Female or Male",
+                "voice": "The voice pitch of character, either of High-pitched, Low, Deep, Squeaky, or Booming. ",
+                "description": "Description of the character, as detail as possible, including appearance, personality, style, etc."
+            }
+        ],
+        "setting": "Description of the setting.",
+        "plot": "Description of the plot."
+    }
+    ```
+    3. The story structure must include characters (maximum ${max_characters} characters), a setting, and a plot.
+    4. Each character in the `characters` array must be an object with the following attributes:
+        - `name`: The name of the character.
+        - `sex`: Must be either "Female" or "Male".
+        - `voice`: Must be one of the following: "High-pitched", "Low", "Deep", "Squeaky", or "Booming".
+        - `description`: A detailed description of the character, including their appearance, personality, style, etc.
+    ${extra_constraints}</constraints>
+    """))
 
-def generate_story_prompt(idea: str) -> Tuple[str, str]:
-    system_instruction = """
-        <role>
-        You are a creative writer.
-        </role>
-        <persona>
-        Your primary goal is to develop a compelling story structure based on the idea provided by the user. You will generate a structured output containing characters, a setting, and a plot.
-        </persona>
-        <constraints>
-        1. Your output MUST be a single, valid JSON object.
-        2. The JSON object must strictly follow this structure:
-        ```json
-        {
-            "characters": [
-                {
-                    "name": "Name of the character",
-                    "sex": "The sex of the character, either of Female or Male",
-                    "voice": "The voice pitch of character, either of High-pitched, Low, Deep, Squeaky, or Booming. ",
-                    "description": "Description of the character, as detail as possible, including appearance, personality, style, etc."
-                }
-            ],
-            "setting": "Description of the setting.",
-            "plot": "Description of the plot."
-        }
-        ```
-        3. The story structure must include characters (maximum 3 characters), a setting, and a plot.
-        4. Each character in the `characters` array must be an object with the following attributes:
-            - `name`: The name of the character.
-            - `sex`: Must be either "Female" or "Male".
-            - `voice`: Must be one of the following: "High-pitched", "Low", "Deep", "Squeaky", or "Booming".
-            - `description`: A detailed description of the character, including their appearance, personality, style, etc.
-        5. Create 2-3 characters for optimal visual storytelling (minimum 1, maximum 3).
-        </constraints>
-    """
-
-    prompt = f"""
-        Please generate a story based on the idea: ***{idea}***
-    """
-    return system_instruction, prompt
+SYSTEM_INSTRUCTION_GENERATE = _STORY_STRUCTURE_SYSTEM_TPL.substitute(
+    max_characters=3,
+    extra_constraints="5. Create 2-3 characters for optimal visual storytelling (minimum 1, maximum 3).\n"
+)
 
-def update_story_prompt(idea: str, characters: str) -> Tuple[str, str]:
-    system_instruction = """
-        <role>
-        You are a creative writer.
-        </role>
-        <persona>
-        Your primary goal is to develop a compelling story structure based on the idea provided by the user. You will generate a structured output containing characters, a setting, and a plot.
-        </persona>
-        <constraints>
-        1. Your output MUST be a single, valid JSON object.
-        2. The JSON object must strictly follow this structure:
-        ```json
-        {
-            "characters": [
-                {
-                    "name": "Name of the character",
-                    "sex": "The sex of the character, either of Female or Male",
-                    "voice": "The voice pitch of character, either of High-pitched, Low, Deep, Squeaky, or Booming. ",
-                    "description": "Description of the character, as detail as possible, including appearance, personality, style, etc."
-                }
-            ],
-            "setting": "Description of the setting.",
-            "plot": "Description of the plot."
-        }
-        ```
-        3. The story structure must include characters (maximum 6 characters), a setting, and a plot.
-        4. Each character in the `characters` array must be an object with the following attributes:
-            - `name`: The name of the character.
-            - `sex`: Must be either "Female" or "Male".
-            - `voice`: Must be one of the following: "High-pitched", "Low", "Deep", "Squeaky", or "Booming".
-            - `description`: A detailed description of the character, including their appearance, personality, style, etc.
-        </constraints>
-    """
-    
-    prompt = f"""
-        Please generate a story based on the idea: 
-            ***{idea}***, 
-        with following characters:
-            ***{characters}***
-    """
+SYSTEM_INSTRUCTION_UPDATE = _STORY_STRUCTURE_SYSTEM_TPL.substitute(
+    max_characters=6,
+    extra_constraints=""
+)
 
-def develop_story_prompt(characters: list[dict], setting: str, plot: str, number_of_scenes: int, duration_per_scene: int, style: str) -> Tuple[str, str]:
-    system_instruction = """    <role>
+SYSTEM_INSTRUCTION_DEVELOP = textwrap.dedent("""
+    <role>
     You are a creative writer.
     </role>
     <persona>
@@ -94,52 +60,133 @@ def develop_story_prompt(characters: list[dict], setting: str, plot: str, number
     2. Do not include any introductory text, closing text, or any other text outside of the JSON object.
     3. The JSON object must strictly follow the structure provided in the user prompt.
     </constraints>
-    """
-    prompt = f"""
-    Here is the information you need to create the story:
-
-    # INFORMATION:
-    ## Characters: ***{characters}***
-    ## Setting: ***{setting}***
-    ## Plot: ***{plot}***
+    """)
 
-    # REQUIREMENTS:
-    ## Number of Scenes: ***{number_of_scenes}***
-    ## Duration per Scene: ***{duration_per_scene}*** seconds
+DEVELOP_PROMPT_PREFIX = textwrap.dedent("""
+    Create the story from the INFORMATION and REQUIREMENTS given at the end of this prompt.
 
     # INSTRUCTIONS:
     ## 1. Be Objective, Specific, and Systematic.
     ## 2. Develop a story that incorporates all the provided character details, setting, and plot. Maximum ***2*** characters each scene, characters must choose from provided character list.
-    ## 3. Divide the story into ***{number_of_scenes}*** consecutive scenes.
-    ## 4. Ensure each scene can be visualized within an ***{duration_per_scene}*** second timeframe.
-    ## 5. Maintain a consistent tone and narrative throughout the story, whole story should be meaningful. 
+    ## 3. Divide the story into the required Number of Scenes, as consecutive scenes.
+    ## 4. Ensure each scene can be visualized within the required Duration per Scene.
+    ## 5. Maintain a consistent tone and narrative throughout the story, whole story should be meaningful.
     ## 6. Each character has a unique description, as much detail as possible in order to be consistent, and the description should be exactly the same for each scene.
-    ## 7. The image/video style should be ***{style}***.
-    ## 8. Make sure Continuity between scenes and the whole things together from begin to end are smoothly. 
+    ## 7. The image/video style should be the required Style.
+    ## 8. Make sure Continuity between scenes and the whole things together from begin to end are smoothly.
 
-    
-    """+"""
-    # OUTPUT AS JSON FORMAT: 
-    {
-        "story_scenes": [
-            {
-            "scene_number": "Integer. The unique, sequential identifier for the scene, defining its chronological order.",
-            "location": "String. The physical environment or 'set' where the scene takes place. Should include scale, key features, and sensory details.",
-            "atmosphere": "String. The overall mood, tone, time of day, and weather of the scene. This defines the 'vibe'.",
-            "characters": ["Array of Strings. A list of all character names who are physically present and active in the scene."],
-            "dialogue": [
-                {
-                "character": "String. The character name.",
-                "line": "String (can include parentheticals for tone, e.g., '(Whispering) Get down.')"
-                }
-            ],
-            "key_actions": ["Array of Strings. A step-by-step list of the main visual events and physical actions that happen in chronological order."],
-            "key_visual_focus": "String. The single most important image of the scene; the 'hero shot' or 'thumbnail' that guides the director's emphasis.",
-            "sound_design": "String. All non-dialogue audio, including music (tone/style), ambient background sounds, and key sound effects (SFX).",
-            "style": "String. The image/video style."
-            }
-        ]
-    }
+    # OUTPUT FORMAT (strict JSON):
+    {"story_scenes":[{"scene_number":int,"location":str,"atmosphere":str,"characters":[str],"dialogue":[{"character":str,"line":str}],"key_actions":[str],"key_visual_focus":str,"sound_design":str,"style":str}]}
+
+    ## Field notes:
+    - scene_number: sequential, starting at 1.
+    - location: the physical set; scale, key features, sensory details.
+    - atmosphere: mood, tone, time of day, weather.
+    - characters: names of the characters present in the scene.
+    - dialogue.line: may include a parenthetical for tone, e.g. "(Whispering) Get down."
+    - key_actions: the main visual events and physical actions, in chronological order.
+    - key_visual_focus: the single most important image of the scene (the hero shot).
+    - sound_design: music, ambient sounds and key sound effects; no dialogue.
+    - style: the image/video style.
+    """)
+
+# User prompt templates, parsed once at import; only the substitution runs per call
+_GENERATE_USER_TPL = Template(textwrap.dedent("""
+    Please generate a story based on the idea: ***${idea}***
+    """))
+
+_UPDATE_USER_TPL = Template(textwrap.dedent("""
+    Please generate a story based on the idea:
+        ***${idea}***,
+    with following characters:
+        ***${characters}***
+    """))
+
+_DEVELOP_USER_TPL = Template(DEVELOP_PROMPT_PREFIX + """
+# INFORMATION:
+## Characters: ***${characters}***
+## Setting: ***${setting}***
+## Plot: ***${plot}***
+
+# REQUIREMENTS:
+## Number of Scenes: ***${number_of_scenes}***
+## Duration per Scene: ***${duration_per_scene}*** seconds
+## Style: ***${style}***
+""")
+
+
+@lru_cache(maxsize=128)
+def generate_story_prompt(idea: str) -> Tuple[str, str]:
+    return SYSTEM_INSTRUCTION_GENERATE, _GENERATE_USER_TPL.substitute(idea=idea)
+
+def update_story_prompt(idea: str, characters: str) -> Tuple[str, str]:
+    # Templates only use str(characters), so that text doubles as a hashable cache key
+    return _update_story_prompt(idea, str(characters))
+
+@lru_cache(maxsize=128)
+def _update_story_prompt(idea: str, characters: str) -> Tuple[str, str]:
+    return SYSTEM_INSTRUCTION_UPDATE, _UPDATE_USER_TPL.substitute(idea=idea, characters=characters)
+
+def develop_story_prompt(characters: list[dict], setting: str, plot: str, number_of_scenes: int, duration_per_scene: int, style: str) -> Tuple[str, str]:
+    return _develop_story_prompt(str(characters), setting, plot, number_of_scenes, duration_per_scene, style)
+
+@lru_cache(maxsize=128)
+def _develop_story_prompt(characters: str, setting: str, plot: str, number_of_scenes: int, duration_per_scene: int, style: str) -> Tuple[str, str]:
+    # Static instructions and output schema first, per-story details last, so
+    # repeated calls share an identical prompt prefix for provider-side caching
+    prompt = _DEVELOP_USER_TPL.substitute(
+        characters=characters,
+        setting=setting,
+        plot=plot,
+        number_of_scenes=number_of_scenes,
+        duration_per_scene=duration_per_scene,
+        style=style
+    )
+    return SYSTEM_INSTRUCTION_DEVELOP, prompt
+
+VEO_PROMPT_SYSTEM_INSTRUCTION = textwrap.dedent("""
+    You are a prompting expert, your task is to create the best prompt for Veo to generate a high-quality video for each scene.
+    """)
+
+_VEO_BATCH_USER_TPL = Template(textwrap.dedent("""
+    For each scene description provided below, create a detailed prompt for generating a high-quality video. Include the following elements in each prompt:
+
+    - Subject: The object, person, animal, or scenery that you want in your video.
+    - Context: The background or context in which the subject is placed.
+    - Action: What the subject is doing (for example, walking, running, or turning their head).
+    - Style: This can be general or very specific. Consider using specific film style keywords, such as horror film, film noir, or animated styles like cartoon style render.
+    - Camera motion: Optional: What the camera is doing, such as aerial view, eye-level, top-down shot, or low-angle shot.
+    - Composition: Optional: How the shot is framed, such as wide shot, close-up, or extreme close-up.
+    - Ambiance: Optional: How the color and light contribute to the scene, such as blue tones, night, or warm tones.
+    - Dialog if any
+
+    Notice:
+    - To differentiate between multiple characters in the images, use the most distinguish descriptive details variable.
+    - Each prompt is plain text without any explaination.
+
+    *OUTPUT*:
+    Output a JSON array of exactly ${count} strings: the first is the prompt for Scene [1], the second for Scene [2], and so on.
+    Output the JSON array only, without explanation.
+
+    Here is the charaters description:
+    ${characters}
+
+    """))
+
+
+def batch_scene_prompt(scenes: list[dict], characters: list[dict], batch_size: int = 5) -> List[str]:
     """
+    Packs scenes into Veo prompt-writing requests of up to batch_size scenes each.
 
-    return system_instruction, prompt
\ No newline at end of file
+    Scenes within a request are labelled [1], [2], ... and the model is asked for
+    a JSON array with one prompt per label, in order.
+    """
+    prompts = []
+    for start in range(0, len(scenes), batch_size):
+        batch = scenes[start:start + batch_size]
+        header = _VEO_BATCH_USER_TPL.substitute(count=len(batch), characters=characters)
+        sections = "\n\n".join(
+            f"# Scene [{i}]\n{scene}" for i, scene in enumerate(batch, start=1)
+        )
+        prompts.append(header + sections + "\n")
+    return prompts
@@ -0,0 +1,111 @@
+"""
+Hash-keyed cache for expensive LLM responses, kept in memory and on disk.
+
+Keys are a SHA-256 of the canonicalized call arguments, so any change to the
+prompt text (including template edits) naturally produces a new key.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from utils.config import LLM_CACHE_DIR
+from utils.logger import logger
+from utils.save_files import write_atomic
+
+# Responses held in memory, least recently used first; older ones are only on disk
+MAX_MEMORY_ENTRIES = 64
+
+_memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def cache_key(*parts: Any) -> str:
+    """Returns a stable SHA-256 key for the given JSON-serializable parts."""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _remember(key: str, created_at: float, value: str) -> None:
+    """Adds an entry to the in-memory LRU, evicting the least recently used beyond MAX_MEMORY_ENTRIES."""
+    with _lock:
+        _memory[key] = (created_at, value)
+        _memory.move_to_end(key)
+        while len(_memory) > MAX_MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def load(key: str, ttl_seconds: int) -> Optional[str]:
+    """Returns a cached response that is younger than ttl_seconds, or None."""
+    now = time.time()
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            _memory.move_to_end(key)
+    if entry is not None and now - entry[0] < ttl_seconds:
+        return entry[1]
+
+    path = os.path.join(LLM_CACHE_DIR, f"{key}.json")
+    try:
+        created_at = os.path.getmtime(path)
+        if now - created_at >= ttl_seconds:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            value = f.read()
+    except OSError:
+        return None
+
+    _remember(key, created_at, value)
+    return value
+
+
+def store(key: str, value: str) -> None:
+    """Stores a response in memory and on disk; disk failures are logged, not raised."""
+    _remember(key, time.time(), value)
+    try:
+        os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+        write_atomic(os.path.join(LLM_CACHE_DIR, f"{key}.json"), value.encode("utf-8"))
+    except OSError as e:
+        logger.warning(f"Failed to write LLM response cache entry: {str(e)}")
+
+
+def cached_response(
+    fn: Callable[..., str],
+    ttl_seconds: int,
+    validate: Optional[Callable[[str], Any]] = None,
+) -> Callable[..., str]:
+    """
+    Wraps a string-returning LLM call so its responses are cached on its arguments.
+
+    Args:
+        fn: The LLM call to wrap
+        ttl_seconds: How long a response is reused; 0 or less calls fn every time.
+            Each caller passes its own setting, since reusing a creative step's
+            output is a choice that belongs to that step
+        validate: Called on each fresh response before it is stored, e.g. json.loads.
+            If it raises, the exception propagates and nothing is cached, so a
+            malformed reply is not served again for the rest of the TTL.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> str:
+        if ttl_seconds <= 0:
+            return fn(*args, **kwargs)
+
+        key = cache_key(fn.__module__, fn.__qualname__, args, kwargs)
+        cached = load(key, ttl_seconds)
+        if cached is not None:
+            logger.info(f"LLM response cache hit for {fn.__qualname__}")
+            return cached
+
+        response = fn(*args, **kwargs)
+        if validate is not None:
+            validate(response)
+        store(key, response)
+        return response
+
+    return wrapper
@@ -0,0 +1,53 @@
+"""
+Retry helpers for transient API failures (rate limits and 5xx responses).
+"""
+
+import random
+import time
+from typing import Callable, TypeVar
+
+from google.genai import errors as genai_errors
+
+from utils.logger import logger
+
+T = TypeVar("T")
+
+# HTTP status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def is_transient_genai_error(error: Exception) -> bool:
+    """Returns True if a google-genai error is a rate limit or transient server error."""
+    return isinstance(error, genai_errors.APIError) and error.code in RETRYABLE_STATUS_CODES
+
+
+def retry_with_backoff(
+    fn: Callable[[], T],
+    is_retryable: Callable[[Exception], bool],
+    tries: int = 5,
+    base_delay: float = 0.5
+) -> T:
+    """
+    Calls fn, retrying with exponential backoff and jitter on retryable errors.
+
+    Args:
+        fn: Zero-argument callable to invoke
+        is_retryable: Predicate deciding whether an exception should be retried
+        tries: Maximum number of attempts
+        base_delay: Delay in seconds before the first retry, doubled on each attempt
+
+    Returns:
+        The return value of fn
+
+    Raises:
+        The last exception raised by fn once it is not retryable or attempts run out
+    """
+    for attempt in range(tries):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == tries - 1 or not is_retryable(e):
+                raise
+            delay = base_delay * 2 ** attempt + random.random() * 0.1
+            logger.warning(f"Transient error, retrying in {delay:.1f}s (attempt {attempt + 1}/{tries}): {str(e)}")
+            time.sleep(delay)
@@ -1,5 +1,11 @@
 import json
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Union
+
 from utils.config import (
     CHARACTERS_JSON,
     SETTING_TXT,
@@ -7,37 +13,84 @@ from utils.config import (
     STORY_JSON,
     VIDEOS_DIR
 )
+from utils.json_compat import dumps
+
+# utils.config creates DEFAULT_SESSION_DIR and VIDEOS_DIR at import, so savers never check for them
+_VIDEOS_PATH = Path(VIDEOS_DIR)
+
+# One "name: description" pair per line; [ \t] rather than \s so matches never span lines
+_CHAR_LINE_RE = re.compile(r'^[ \t]*([^:\n]+?)[ \t]*:[ \t]*(.*?)\s*?$', re.MULTILINE)
+
+def write_atomic(path: Union[str, Path], data: bytes) -> None:
+    """Writes data in one call to a temp file, then renames it over path so readers never see a partial file."""
+    tmp_path = Path(f"{path}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 def save_characters(characters):
-    with open(CHARACTERS_JSON, "w") as f:
-        if isinstance(characters, str):
-            char_list = []
-            for line in characters.split('\n'):
-                if line.strip():
-                    name, desc = line.split(':', 1)
-                    char_list.append({"name": name.strip(), "description": desc.strip()})
-            json.dump(char_list, f, indent=4)
-        else:
-            json.dump(characters, f, indent=4)
+    if isinstance(characters, str):
+        characters = [
+            {"name": m.group(1), "description": m.group(2)}
+            for m in _CHAR_LINE_RE.finditer(characters)
+        ]
+    write_atomic(CHARACTERS_JSON, dumps(characters, pretty=True))
 
 def save_setting(setting):
-    with open(SETTING_TXT, "w") as f:
-        f.write(setting)
+    write_atomic(SETTING_TXT, setting.encode("utf-8"))
 
 def save_plot(plot):
-    with open(PLOT_TXT, "w") as f:
-        f.write(plot)
+    write_atomic(PLOT_TXT, plot.encode("utf-8"))
 
 def save_story(story_json):
-    with open(STORY_JSON, "w") as f:
-        f.write(json.dumps(story_json, indent=4))
+    write_atomic(STORY_JSON, dumps(story_json, pretty=True))
 
 def save_prompt(scene_num, prompt):
-    with open(os.path.join(VIDEOS_DIR, f"scene_prompt_{scene_num}.txt"), "w") as f:
-        f.write(prompt)
+    write_atomic(_VIDEOS_PATH / f"scene_prompt_{scene_num}.txt", prompt.encode("utf-8"))
 
-def save_script(scene_num, script, is_v31):
+def save_script(scene_num, script: Union[str, bytes, list, dict], is_v31):
+    """
+    Saves a scene script. Text, e.g. from an editable script box, is checked to be
+    valid JSON and written as typed; bytes are taken as JSON already serialized with
+    json_compat.dumps; lists and dicts are serialized with indentation.
+
+    Raises:
+        json.JSONDecodeError: If a text script is not valid JSON
+    """
     v31 = "v31_" if is_v31 else ""
     if script:
-        with open(os.path.join(VIDEOS_DIR, f"{v31}scene_script_{scene_num}.json"), "w") as f:
-            f.write(json.dumps(json.loads(script), indent=4))
\ No newline at end of file
+        if isinstance(script, str):
+            # Fail here rather than later when audio generation parses the saved file
+            json.loads(script)
+            data = script.encode("utf-8")
+        elif isinstance(script, bytes):
+            data = script
+        else:
+            data = dumps(script, pretty=True)
+        write_atomic(_VIDEOS_PATH / f"{v31}scene_script_{scene_num}.json", data)
+
+def save_bundle(characters, setting, plot, story_json=None):
+    """Writes the independent story files concurrently, re-raising the first failure."""
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(save_characters, characters),
+            executor.submit(save_setting, setting),
+            executor.submit(save_plot, plot),
+        ]
+        if story_json is not None:
+            futures.append(executor.submit(save_story, story_json))
+    for future in futures:
+        future.result()
+
+def save_scripts(scripts, is_v31):
+    """Writes one script file per scene concurrently; scene numbers start at 1."""
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(save_script, i, script, is_v31)
+            for i, script in enumerate(scripts, 1)
+        ]
+    for future in futures:
+        future.result()
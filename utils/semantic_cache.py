@@ -0,0 +1,200 @@
+"""
+Semantic cache for LLM responses to near-duplicate inputs.
+
+Inputs are embedded with a Gemini embedding model and compared by cosine
+similarity, so rephrasings of the same story idea can reuse an earlier response.
+Entries are grouped by namespace (e.g. a hash of the system instruction), so a
+prompt change never serves responses produced by an older prompt; the embedding
+model is part of every namespace too. The cache is off unless
+SEMANTIC_CACHE_TTL_SECONDS is set.
+"""
+
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+from google import genai
+
+from models.config import GEMINI_API_KEY, EMBEDDING_MODEL_ID
+from utils.config import LLM_CACHE_DIR, SEMANTIC_CACHE_TTL_SECONDS
+from utils import json_compat
+from utils.logger import logger
+from utils.save_files import write_atomic
+
+SIMILARITY_THRESHOLD = 0.95
+MAX_ENTRIES_PER_NAMESPACE = 256
+SEMANTIC_CACHE_FILE = os.path.join(LLM_CACHE_DIR, "semantic_cache.json")
+
+_client: Optional[genai.Client] = None
+_lock = threading.Lock()
+# namespace -> {"embeddings": (N, D) unit-normalized array, "responses": [str, ...],
+#               "timestamps": (N,) array of creation times in epoch seconds}
+_entries: Optional[Dict[str, Dict]] = None
+
+
+def _get_client() -> genai.Client:
+    """Returns the shared Gemini client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = genai.Client(api_key=GEMINI_API_KEY)
+    return _client
+
+
+@lru_cache(maxsize=32)
+def _embed_normalized(text: str) -> np.ndarray:
+    """Embeds text and unit-normalizes it; cached so a miss followed by remember() embeds once."""
+    result = _get_client().models.embed_content(model=EMBEDDING_MODEL_ID, contents=text)
+    vector = np.asarray(result.embeddings[0].values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def _embed(text: str) -> Optional[np.ndarray]:
+    """Returns the unit-normalized embedding of text, or None if embedding fails."""
+    try:
+        return _embed_normalized(text)
+    except Exception as e:
+        logger.warning(f"Semantic cache embedding failed, skipping cache: {str(e)}")
+        return None
+
+
+def _load() -> Dict[str, Dict]:
+    """Loads persisted entries on first use; must be called with _lock held."""
+    global _entries
+    if _entries is None:
+        _entries = {}
+        try:
+            with open(SEMANTIC_CACHE_FILE, "r", encoding="utf-8") as f:
+                for namespace, entry in json.load(f).items():
+                    responses = entry["responses"]
+                    # Files written before timestamps were stored load as expired
+                    timestamps = entry.get("timestamps", [0.0] * len(responses))
+                    _entries[namespace] = {
+                        "embeddings": np.asarray(entry["embeddings"], dtype=np.float32),
+                        "responses": responses,
+                        "timestamps": np.asarray(timestamps, dtype=np.float64),
+                    }
+        except (OSError, ValueError, KeyError):
+            pass
+    return _entries
+
+
+def _persist(entries: Dict[str, Dict]) -> None:
+    """Writes entries to disk; must be called with _lock held."""
+    data = {
+        namespace: {
+            "embeddings": entry["embeddings"].tolist(),
+            "responses": entry["responses"],
+            "timestamps": entry["timestamps"].tolist(),
+        }
+        for namespace, entry in entries.items()
+    }
+    try:
+        os.makedirs(os.path.dirname(SEMANTIC_CACHE_FILE), exist_ok=True)
+        write_atomic(SEMANTIC_CACHE_FILE, json_compat.dumps(data))
+    except OSError as e:
+        logger.warning(f"Failed to persist semantic cache: {str(e)}")
+
+
+def _partition(namespace: str) -> str:
+    """Returns the stored key for namespace; embeddings from different models never share one."""
+    return f"{EMBEDDING_MODEL_ID}:{namespace}"
+
+
+def _reusable(entry: Dict, embedding: np.ndarray, now: float) -> np.ndarray:
+    """Returns a mask of the entries that are unexpired and comparable with embedding."""
+    stored = entry["embeddings"]
+    if stored.ndim != 2 or stored.shape[1] != embedding.shape[0]:
+        # Written with a different embedding size; none of them can be compared
+        return np.zeros(len(entry["responses"]), dtype=bool)
+    return now - entry["timestamps"] < SEMANTIC_CACHE_TTL_SECONDS
+
+
+def lookup(namespace: str, text: str) -> Optional[str]:
+    """
+    Returns a cached response whose input is semantically close to text.
+
+    Entries older than SEMANTIC_CACHE_TTL_SECONDS are never returned. Any failure
+    is logged and treated as a miss, so the cache can never break generation.
+
+    Args:
+        namespace: Cache partition, typically derived from the prompt template
+        text: The variable input, e.g. the user's story idea
+
+    Returns:
+        The cached response, or None on a miss or when caching is disabled
+    """
+    if SEMANTIC_CACHE_TTL_SECONDS <= 0:
+        return None
+    try:
+        return _lookup(_partition(namespace), text)
+    except Exception as e:
+        logger.warning(f"Semantic cache lookup failed, treating as a miss: {str(e)}")
+        return None
+
+
+def _lookup(partition: str, text: str) -> Optional[str]:
+    with _lock:
+        entry = _load().get(partition)
+    if entry is None or not entry["responses"]:
+        return None
+
+    embedding = _embed(text)
+    if embedding is None:
+        return None
+
+    usable = _reusable(entry, embedding, time.time())
+    if not usable.any():
+        return None
+    similarities = np.where(usable, entry["embeddings"] @ embedding, -np.inf)
+    best = int(np.argmax(similarities))
+    if similarities[best] < SIMILARITY_THRESHOLD:
+        return None
+    logger.info(f"Semantic cache hit (similarity={similarities[best]:.3f})")
+    return entry["responses"][best]
+
+
+def remember(namespace: str, text: str, response: str) -> None:
+    """
+    Stores a response for text. Expired or incomparable entries are dropped, then
+    the oldest beyond MAX_ENTRIES_PER_NAMESPACE. Failures are logged, not raised.
+
+    Args:
+        namespace: Cache partition, typically derived from the prompt template
+        text: The variable input the response was generated for
+        response: The LLM response to cache
+    """
+    if SEMANTIC_CACHE_TTL_SECONDS <= 0:
+        return
+    try:
+        _remember(_partition(namespace), text, response)
+    except Exception as e:
+        logger.warning(f"Failed to update semantic cache: {str(e)}")
+
+
+def _remember(partition: str, text: str, response: str) -> None:
+    embedding = _embed(text)
+    if embedding is None:
+        return
+
+    with _lock:
+        now = time.time()
+        entries = _load()
+        entry = entries.get(partition)
+        embeddings: List = [embedding]
+        responses = [response]
+        timestamps = [now]
+        if entry is not None:
+            keep = np.flatnonzero(_reusable(entry, embedding, now))
+            embeddings = [*entry["embeddings"][keep], embedding]
+            responses = [*(entry["responses"][i] for i in keep), response]
+            timestamps = [*entry["timestamps"][keep], now]
+        entries[partition] = {
+            "embeddings": np.vstack(embeddings[-MAX_ENTRIES_PER_NAMESPACE:]),
+            "responses": responses[-MAX_ENTRIES_PER_NAMESPACE:],
+            "timestamps": np.asarray(timestamps[-MAX_ENTRIES_PER_NAMESPACE:], dtype=np.float64),
+        }
+        _persist(entries)
@@ -5,45 +5,62 @@ Provides helper functions for managing and formatting status messages
 across the entire application UI.
 """
 
-import datetime
-from typing import List
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Deque, Iterable, Union
 
+# Maximum number of status messages kept; older ones are evicted on append
+MAX_STATUS_LINES = 100
 
-def append_status(message: str, current_messages: List[str], level: str = "INFO") -> List[str]:
+
+class Level(IntEnum):
+    """Status message levels; values index _ICON_PREFIXES."""
+    INFO = 0
+    SUCCESS = 1
+    ERROR = 2
+    WARNING = 3
+    PROGRESS = 4
+    READY = 5
+
+
+# Icon plus trailing space for each level, in Level order
+_ICON_PREFIXES = ("ℹ️ ", "✅ ", "❌ ", "⚠️ ", "⏳ ", "🟢 ")
+
+# Bound once; time.strftime skips building a datetime object per message
+_strftime = time.strftime
+_localtime = time.localtime
+
+
+def append_status(message: str, current_messages: Iterable[str], level: Union[Level, str] = Level.INFO) -> Deque[str]:
     """
     Append a status message with timestamp and icon.
 
     Args:
         message: Status message text
-        current_messages: Current list of status messages
-        level: Message level - "INFO", "SUCCESS", "ERROR", "WARNING", "PROGRESS"
+        current_messages: Current status messages (a bounded deque, or any iterable)
+        level: Message level, a Level member or its name ("INFO", "SUCCESS", "ERROR", "WARNING", "PROGRESS")
 
     Returns:
-        Updated list of messages
+        Updated deque of messages, holding at most MAX_STATUS_LINES entries
     """
-    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-
-    # Icon mapping for different levels
-    icons = {
-        "INFO": "ℹ️",
-        "SUCCESS": "✅",
-        "ERROR": "❌",
-        "WARNING": "⚠️",
-        "PROGRESS": "⏳",
-        "READY": "🟢"
-    }
-    icon = icons.get(level, "ℹ️")
+    timestamp = _strftime("%H:%M:%S", _localtime())
+    if isinstance(level, str):
+        level = Level.__members__.get(level, Level.INFO)
 
-    formatted_msg = f"[{timestamp}] {icon} {message}"
-    return current_messages + [formatted_msg]
+    formatted_msg = f"[{timestamp}] {_ICON_PREFIXES[level]}{message}"
+    if not isinstance(current_messages, deque) or current_messages.maxlen != MAX_STATUS_LINES:
+        current_messages = deque(current_messages, maxlen=MAX_STATUS_LINES)
+    current_messages.append(formatted_msg)
+    return current_messages
 
 
-def format_status_display(messages: List[str], max_lines: int = 100) -> str:
+def format_status_display(messages: Iterable[str], max_lines: int = MAX_STATUS_LINES) -> str:
     """
-    Convert message list to display string.
+    Convert messages to display string.
 
     Args:
-        messages: List of formatted status messages
+        messages: Formatted status messages
         max_lines: Maximum number of lines to display (keeps most recent)
 
     Returns:
@@ -52,33 +69,32 @@ def format_status_display(messages: List[str], max_lines: int = 100) -> str:
     if not messages:
         return "🟢 Ready"
 
-    # Keep only last max_lines messages
-    recent = messages[-max_lines:] if len(messages) > max_lines else messages
-    return "\n".join(recent)
+    # A deque created by append_status is already bounded to MAX_STATUS_LINES
+    if len(messages) > max_lines:
+        messages = list(messages)[-max_lines:]
+    return "\n".join(messages)
 
 
-def clear_status() -> List[str]:
+def clear_status() -> Deque[str]:
     """
     Clear all status messages.
 
     Returns:
-        Empty list
+        Empty bounded deque
     """
-    return []
+    return deque(maxlen=MAX_STATUS_LINES)
 
 
-def get_status_summary(messages: List[str]) -> str:
+def get_status_summary(messages: Deque[str]) -> str:
     """
     Get a summary of the current status.
 
     Returns the last message or "Ready" if no messages.
 
     Args:
-        messages: List of status messages
+        messages: Status messages
 
     Returns:
         Last status message or default
     """
-    if not messages:
-        return "🟢 Ready"
     return messages[-1] if messages else "🟢 Ready"
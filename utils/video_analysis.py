@@ -7,24 +7,164 @@ computing quality metrics for video validation agents.
 
 import os
 import subprocess
-import tempfile
 import json
-from typing import List, Dict, Tuple, Optional
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from fractions import Fraction
+from functools import lru_cache
+from typing import List, Dict, Tuple, Optional, Set
 from pathlib import Path
 from PIL import Image
 import base64
 from io import BytesIO
 
+from utils import json_compat
 from utils.logger import logger
 
 
-def extract_key_frames(video_path: str, num_frames: int = 10) -> List[Image.Image]:
+FRAME_EXTRACTION_TIMEOUT = 30  # seconds per ffmpeg frame extraction call
+PROBE_CACHE_SIZE = 256  # ffprobe results kept, keyed on path, modification time and size
+MAX_CONCURRENT_FFMPEG = min(os.cpu_count() or 1, 8)  # frame-extraction ffmpeg processes running at once
+# ffprobe fields read by get_video_metadata; asking only for these keeps the JSON small
+PROBE_STREAM_FIELDS = 'codec_type,codec_name,width,height,r_frame_rate,pix_fmt'
+PROBE_FORMAT_FIELDS = 'duration,size,bit_rate'
+MOTION_ANALYSIS_WINDOW_SECONDS = 10  # length of the clip window decoded by calculate_motion_quality
+MOTION_ANALYSIS_HEIGHT = 128  # frame height the window is downscaled to before analysis
+MAX_ENCODED_FRAME_SIZE = 1280  # longest side, in pixels, of frames sent to the API
+SEEK_MARGIN_SECONDS = 1.0  # decode this much before the first requested frame
+JPEG_SOI = b'\xff\xd8'  # JPEG start-of-image marker
+JPEG_EOI = b'\xff\xd9'  # JPEG end-of-image marker
+
+# Keywords the quality heuristics look for in ffmpeg's stderr
+_QUALITY_KEYWORDS_RE = re.compile(
+    r'duplicate|drop|corrupt|error|overread|invalid|progressive|interlaced',
+    re.IGNORECASE
+)
+
+# Caps frame-extraction ffmpeg processes across threads; unbounded spawning exhausts memory
+_ffmpeg_slots = threading.BoundedSemaphore(MAX_CONCURRENT_FFMPEG)
+
+
+def _timestamps_select_filter(timestamps: List[float]) -> str:
+    """
+    Build a select filter that keeps the first frame at or after each timestamp.
+
+    A frame matches timestamp T when its own time is >= T and the previous
+    frame's time is < T, so exactly one frame is picked per timestamp
+    regardless of the video's frame rate.
+    """
+    terms = [f"gte(t\\,{ts:.3f})*lt(prev_pts*TB\\,{ts:.3f})" for ts in timestamps]
+    return f"select={'+'.join(terms)}"
+
+
+def _split_jpegs(data: bytes) -> List[bytes]:
+    """Split a concatenated MJPEG stream into individual JPEG images."""
+    images = []
+    start = data.find(JPEG_SOI)
+    while start != -1:
+        end = data.find(JPEG_EOI, start + len(JPEG_SOI))
+        if end == -1:
+            break
+        end += len(JPEG_EOI)
+        images.append(data[start:end])
+        start = data.find(JPEG_SOI, end)
+    return images
+
+
+def _decode_rgb_frame(jpeg: bytes) -> Image.Image:
+    """Decode a JPEG image held in memory into an RGB PIL image."""
+    return Image.open(BytesIO(jpeg)).convert('RGB')
+
+
+def _extract_frame_at(video_path: str, timestamp: float) -> Optional[Image.Image]:
+    """Extract a single frame at timestamp with its own ffmpeg call, or None on failure."""
+    cmd = [
+        'ffmpeg',
+        '-nostats', '-loglevel', 'error',  # stderr is only logged on failure
+        '-ss', str(timestamp),  # Seek to timestamp
+        '-i', video_path,
+        '-vframes', '1',  # Extract 1 frame
+        '-q:v', '2',  # High quality
+        '-f', 'image2pipe',
+        '-vcodec', 'mjpeg',
+        '-'
+    ]
+
+    with _ffmpeg_slots:
+        result = subprocess.run(cmd, capture_output=True, timeout=FRAME_EXTRACTION_TIMEOUT)
+
+    if result.returncode != 0:
+        logger.warning(f"Failed to extract frame at {timestamp}s: {result.stderr.decode(errors='replace')}")
+        return None
+    jpegs = _split_jpegs(result.stdout)
+    if not jpegs:
+        return None
+    return _decode_rgb_frame(jpegs[0])
+
+
+def _extract_frames(video_path: str, timestamps: List[float]) -> List[Image.Image]:
+    """
+    Extract frames at the given timestamps in a single ffmpeg pass.
+
+    Frames are streamed as MJPEG over ffmpeg's stdout and decoded in memory.
+    Falls back to one ffmpeg call per timestamp if the batched call fails.
+
+    Args:
+        video_path: Path to the video file
+        timestamps: Frame timestamps in seconds, in ascending order
+
+    Returns:
+        List of PIL Image objects in timestamp order
+    """
+    # Seek (accurately) to just before the first timestamp so the part of the video
+    # before it is not decoded. Timestamps restart at 0 from the seek point, and the
+    # margin guarantees a preceding frame for the select filter to compare against.
+    seek_start = max(0.0, timestamps[0] - SEEK_MARGIN_SECONDS)
+
+    cmd = [
+        'ffmpeg',
+        '-nostats', '-loglevel', 'error',  # stderr is only logged on failure
+        '-ss', f"{seek_start:.3f}",
+        '-i', video_path,
+        '-vf', _timestamps_select_filter([ts - seek_start for ts in timestamps]),
+        '-vsync', 'vfr',  # Only emit the selected frames
+        '-q:v', '2',  # High quality
+        '-f', 'image2pipe',
+        '-vcodec', 'mjpeg',
+        '-'
+    ]
+
+    with _ffmpeg_slots:
+        result = subprocess.run(cmd, capture_output=True, timeout=FRAME_EXTRACTION_TIMEOUT)
+
+    if result.returncode == 0:
+        return [_decode_rgb_frame(jpeg) for jpeg in _split_jpegs(result.stdout)]
+
+    logger.warning(
+        f"Batched frame extraction failed, extracting frames one by one: {result.stderr.decode(errors='replace')}"
+    )
+    frames = []
+    for i, timestamp in enumerate(timestamps):
+        frame = _extract_frame_at(video_path, timestamp)
+        if frame is not None:
+            frames.append(frame)
+            logger.debug(f"Extracted frame {i+1}/{len(timestamps)} at {timestamp:.2f}s")
+    return frames
+
+
+def extract_key_frames(
+    video_path: str,
+    num_frames: int = 10,
+    duration: Optional[float] = None
+) -> List[Image.Image]:
     """
     Extract evenly-spaced key frames from a video.
 
     Args:
         video_path: Path to the video file
         num_frames: Number of frames to extract (default: 10)
+        duration: Video duration in seconds, if already known; probed with ffprobe otherwise
 
     Returns:
         List of PIL Image objects
@@ -37,70 +177,72 @@ def extract_key_frames(video_path: str, num_frames: int = 10) -> List[Image.Imag
 
     logger.info(f"Extracting {num_frames} key frames from: {video_path}")
 
-    # Create temporary directory for frames
-    with tempfile.TemporaryDirectory() as temp_dir:
-        try:
-            # Get video duration first
+    try:
+        # Get video duration first, unless the caller already knows it
+        if duration is None:
             duration = get_video_duration(video_path)
-            if duration <= 0:
-                raise ValueError(f"Invalid video duration: {duration}")
-
-            # Calculate frame timestamps (evenly spaced)
-            interval = duration / (num_frames + 1)  # +1 to avoid last frame
-            timestamps = [interval * (i + 1) for i in range(num_frames)]
-
-            frames = []
-            for i, timestamp in enumerate(timestamps):
-                output_path = os.path.join(temp_dir, f"frame_{i:03d}.jpg")
-
-                # Extract frame at specific timestamp using FFmpeg
-                cmd = [
-                    'ffmpeg',
-                    '-ss', str(timestamp),  # Seek to timestamp
-                    '-i', video_path,
-                    '-vframes', '1',  # Extract 1 frame
-                    '-q:v', '2',  # High quality
-                    '-y',  # Overwrite
-                    output_path
-                ]
-
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-
-                if result.returncode != 0:
-                    logger.warning(f"Failed to extract frame {i} at {timestamp}s: {result.stderr}")
-                    continue
-
-                if os.path.exists(output_path):
-                    img = Image.open(output_path)
-                    # Convert to RGB if needed
-                    if img.mode != 'RGB':
-                        img = img.convert('RGB')
-                    frames.append(img.copy())  # Copy to keep after temp dir cleanup
-                    logger.debug(f"Extracted frame {i+1}/{num_frames} at {timestamp:.2f}s")
-
-            if not frames:
-                raise Exception("No frames could be extracted from video")
-
-            logger.info(f"Successfully extracted {len(frames)} frames from {video_path}")
-            return frames
-
-        except subprocess.TimeoutExpired:
-            logger.error(f"FFmpeg timeout while extracting frames from {video_path}")
-            raise Exception("Video frame extraction timed out")
-        except Exception as e:
-            logger.error(f"Error extracting frames: {str(e)}")
-            raise
+        if duration <= 0:
+            raise ValueError(f"Invalid video duration: {duration}")
+
+        # Calculate frame timestamps (evenly spaced)
+        interval = duration / (num_frames + 1)  # +1 to avoid last frame
+        timestamps = [interval * (i + 1) for i in range(num_frames)]
+
+        frames = _extract_frames(video_path, timestamps)
+
+        if not frames:
+            raise Exception("No frames could be extracted from video")
+
+        logger.info(f"Successfully extracted {len(frames)} frames from {video_path}")
+        return frames
+
+    except subprocess.TimeoutExpired:
+        logger.error(f"FFmpeg timeout while extracting frames from {video_path}")
+        raise Exception("Video frame extraction timed out")
+    except Exception as e:
+        logger.error(f"Error extracting frames: {str(e)}")
+        raise
+
+
+def extract_key_frames_many(video_paths: List[str], num_frames: int = 10) -> Dict[str, List[Image.Image]]:
+    """
+    Extract key frames from several videos concurrently.
+
+    At most MAX_CONCURRENT_FFMPEG extractions run at a time. Threads are enough
+    here since the work happens in the ffmpeg child processes.
+
+    Args:
+        video_paths: Paths to the video files
+        num_frames: Number of frames to extract per video (default: 10)
+
+    Returns:
+        Dictionary mapping each video path to its frames; videos that fail map to an empty list
+    """
+    # Pre-fill so the result follows the input order and failures stay empty
+    results: Dict[str, List[Image.Image]] = {path: [] for path in video_paths}
+    if not video_paths:
+        return results
+
+    with ThreadPoolExecutor(max_workers=min(len(video_paths), MAX_CONCURRENT_FFMPEG)) as executor:
+        futures = {
+            executor.submit(extract_key_frames, path, num_frames): path
+            for path in video_paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results[path] = future.result()
+            except Exception as e:
+                logger.warning(f"Skipping frames for {path}: {str(e)}")
+
+    return results
 
 
 def extract_character_frames(
     video_path: str,
     num_frames: int = 5,
-    crop_faces: bool = False
+    crop_faces: bool = False,
+    duration: Optional[float] = None
 ) -> List[Image.Image]:
     """
     Extract frames focused on character appearances.
@@ -112,6 +254,7 @@ def extract_character_frames(
         video_path: Path to the video file
         num_frames: Number of frames to extract
         crop_faces: If True, attempt to crop to face regions (not implemented yet)
+        duration: Video duration in seconds, if already known; probed with ffprobe otherwise
 
     Returns:
         List of PIL Image objects focused on characters
@@ -119,47 +262,38 @@ def extract_character_frames(
     logger.info(f"Extracting {num_frames} character-focused frames from: {video_path}")
 
     # For now, extract frames from middle 60% of video (skip intro/outro)
-    with tempfile.TemporaryDirectory() as temp_dir:
+    if duration is None:
         duration = get_video_duration(video_path)
 
-        # Focus on middle 60% of video
-        start_time = duration * 0.2
-        end_time = duration * 0.8
-        effective_duration = end_time - start_time
-
-        interval = effective_duration / (num_frames + 1)
-        timestamps = [start_time + interval * (i + 1) for i in range(num_frames)]
-
-        frames = []
-        for i, timestamp in enumerate(timestamps):
-            output_path = os.path.join(temp_dir, f"char_frame_{i:03d}.jpg")
-
-            cmd = [
-                'ffmpeg',
-                '-ss', str(timestamp),
-                '-i', video_path,
-                '-vframes', '1',
-                '-q:v', '2',
-                '-y',
-                output_path
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-
-            if result.returncode == 0 and os.path.exists(output_path):
-                img = Image.open(output_path)
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                frames.append(img.copy())
-
-        logger.info(f"Extracted {len(frames)} character frames")
-        return frames
+    # Focus on middle 60% of video
+    start_time = duration * 0.2
+    end_time = duration * 0.8
+    effective_duration = end_time - start_time
+
+    interval = effective_duration / (num_frames + 1)
+    timestamps = [start_time + interval * (i + 1) for i in range(num_frames)]
+
+    frames = _extract_frames(video_path, timestamps)
+
+    logger.info(f"Extracted {len(frames)} character frames")
+    return frames
+
+
+def _parse_frame_rate(rate: Optional[str]) -> float:
+    """Convert an ffprobe rate such as "30/1" or "30000/1001" to fps; "0/0" and junk give 0.0."""
+    try:
+        return float(Fraction(rate or '0/1'))
+    except (ValueError, ZeroDivisionError):
+        return 0.0
 
 
 def get_video_metadata(video_path: str) -> Dict:
     """
     Extract comprehensive video metadata using FFprobe.
 
+    Results are cached per file path, modification time and size, so
+    repeated calls for an unchanged video do not spawn ffprobe again.
+
     Args:
         video_path: Path to the video file
 
@@ -169,16 +303,23 @@ def get_video_metadata(video_path: str) -> Dict:
     if not os.path.exists(video_path):
         raise FileNotFoundError(f"Video file not found: {video_path}")
 
+    stat = os.stat(video_path)
+    # Copy so callers cannot mutate the cached entry
+    return dict(_probe_metadata(video_path, stat.st_mtime_ns, stat.st_size))
+
+
+@lru_cache(maxsize=PROBE_CACHE_SIZE)
+def _probe_metadata(video_path: str, mtime_ns: int, size: int) -> Dict:
+    """Run ffprobe for get_video_metadata; mtime_ns and size only key the cache."""
     logger.debug(f"Extracting metadata from: {video_path}")
 
     try:
-        # Use ffprobe to get video info in JSON format
+        # Use ffprobe to get video info in JSON format, limited to the fields read below
         cmd = [
             'ffprobe',
             '-v', 'quiet',
             '-print_format', 'json',
-            '-show_format',
-            '-show_streams',
+            '-show_entries', f"stream={PROBE_STREAM_FIELDS}:format={PROBE_FORMAT_FIELDS}",
             video_path
         ]
 
@@ -192,7 +333,7 @@ def get_video_metadata(video_path: str) -> Dict:
         if result.returncode != 0:
             raise Exception(f"FFprobe failed: {result.stderr}")
 
-        data = json.loads(result.stdout)
+        data = json_compat.loads(result.stdout)
 
         # Extract video stream info
         video_stream = next(
@@ -203,13 +344,20 @@ def get_video_metadata(video_path: str) -> Dict:
         if not video_stream:
             raise Exception("No video stream found in file")
 
+        audio_stream = next(
+            (s for s in data.get('streams', []) if s.get('codec_type') == 'audio'),
+            None
+        )
+
         metadata = {
             'duration': float(data.get('format', {}).get('duration', 0)),
             'size_bytes': int(data.get('format', {}).get('size', 0)),
             'width': int(video_stream.get('width', 0)),
             'height': int(video_stream.get('height', 0)),
-            'fps': eval(video_stream.get('r_frame_rate', '0/1')),  # Converts "30/1" to 30.0
+            'fps': _parse_frame_rate(video_stream.get('r_frame_rate')),
             'codec': video_stream.get('codec_name', 'unknown'),
+            'pix_fmt': video_stream.get('pix_fmt', 'unknown'),
+            'audio_codec': audio_stream.get('codec_name', 'unknown') if audio_stream else None,
             'bitrate': int(data.get('format', {}).get('bit_rate', 0)),
             'aspect_ratio': f"{video_stream.get('width', 0)}:{video_stream.get('height', 0)}"
         }
@@ -232,37 +380,21 @@ def get_video_duration(video_path: str) -> float:
     """
     Get video duration in seconds.
 
+    Shares get_video_metadata's cached ffprobe call, so a video is probed
+    once however many of the two are called.
+
     Args:
         video_path: Path to the video file
 
     Returns:
         Duration in seconds
     """
-    try:
-        cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            video_path
-        ]
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-
-        if result.returncode != 0:
-            raise Exception(f"FFprobe failed: {result.stderr}")
+    return get_video_metadata(video_path)['duration']
 
-        duration = float(result.stdout.strip())
-        return duration
 
-    except Exception as e:
-        logger.error(f"Error getting video duration: {str(e)}")
-        raise
+def _stderr_keywords(stderr: str) -> Set[str]:
+    """Return the lowercased quality keywords present in ffmpeg stderr, found in one regex pass."""
+    return {match.lower() for match in _QUALITY_KEYWORDS_RE.findall(stderr)}
 
 
 def calculate_motion_quality(video_path: str) -> float:
@@ -280,12 +412,23 @@ def calculate_motion_quality(video_path: str) -> float:
     logger.debug(f"Calculating motion quality for: {video_path}")
 
     try:
+        # Only a downscaled window from the middle of the video is decoded; the
+        # heuristic below reads ffmpeg's stderr, which a full-resolution pass does not improve
+        try:
+            window_start = get_video_duration(video_path) * 0.2
+        except Exception:
+            window_start = 0.0
+
         # Use FFmpeg's select filter to analyze motion vectors
         # This is a simplified heuristic - in production might use more sophisticated analysis
         cmd = [
             'ffmpeg',
+            '-hide_banner',
+            '-nostats',  # The final stats report, read by the heuristic, is still printed
+            '-ss', f"{window_start:.3f}",
+            '-t', str(MOTION_ANALYSIS_WINDOW_SECONDS),
             '-i', video_path,
-            '-vf', 'select=gt(scene\\,0.3)',  # Detect scene changes
+            '-vf', f"scale=-2:{MOTION_ANALYSIS_HEIGHT},select=gt(scene\\,0.3)",  # Detect scene changes
             '-vsync', 'vfr',
             '-f', 'null',
             '-'
@@ -304,16 +447,16 @@ def calculate_motion_quality(video_path: str) -> float:
 
         # If video processes without errors and has reasonable stats, assume good quality
         # This is a placeholder - real implementation would analyze actual motion data
-        stderr = result.stderr.lower()
+        keywords = _stderr_keywords(result.stderr)
 
         quality_score = 0.85  # Base score
 
         # Penalize for indicators of poor quality
-        if 'duplicate' in stderr or 'drop' in stderr:
+        if keywords & {'duplicate', 'drop'}:
             quality_score -= 0.1
-        if 'corrupt' in stderr or 'error' in stderr:
+        if keywords & {'corrupt', 'error'}:
             quality_score -= 0.2
-        if 'overread' in stderr or 'invalid' in stderr:
+        if keywords & {'overread', 'invalid'}:
             quality_score -= 0.15
 
         quality_score = max(0.0, min(1.0, quality_score))
@@ -329,33 +472,51 @@ def calculate_motion_quality(video_path: str) -> float:
         return 0.7
 
 
+def _frame_to_base64(indexed_frame: Tuple[int, Image.Image]) -> Optional[str]:
+    """Encode one frame as a base64 JPEG string, or None if encoding fails."""
+    i, frame = indexed_frame
+    try:
+        # Downscale very large frames; resize returns a new image, so the caller's frame is untouched
+        longest_side = max(frame.size)
+        if longest_side > MAX_ENCODED_FRAME_SIZE:
+            scale = MAX_ENCODED_FRAME_SIZE / longest_side
+            frame = frame.resize(
+                (max(1, round(frame.width * scale)), max(1, round(frame.height * scale))),
+                Image.LANCZOS
+            )
+
+        # Convert to JPEG in memory; progressive 4:2:0 keeps the payload small for API transmission
+        buffer = BytesIO()
+        frame.save(buffer, format='JPEG', quality=80, optimize=True, progressive=True, subsampling=2)
+
+        # Encode to base64
+        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+    except Exception as e:
+        logger.warning(f"Failed to convert frame {i} to base64: {str(e)}")
+        return None
+
+
 def frames_to_base64(frames: List[Image.Image]) -> List[str]:
     """
     Convert PIL Image frames to base64 strings for API transmission.
 
+    Frames are encoded in a thread pool; Pillow releases the GIL while
+    encoding JPEGs, so this scales with the number of cores.
+
     Args:
         frames: List of PIL Image objects
 
     Returns:
-        List of base64-encoded image strings
+        List of base64-encoded image strings, in frame order
     """
-    base64_frames = []
-
-    for i, frame in enumerate(frames):
-        try:
-            # Convert to JPEG in memory
-            buffer = BytesIO()
-            frame.save(buffer, format='JPEG', quality=85)
-            buffer.seek(0)
-
-            # Encode to base64
-            b64_string = base64.b64encode(buffer.read()).decode('utf-8')
-            base64_frames.append(b64_string)
+    if not frames:
+        return []
 
-        except Exception as e:
-            logger.warning(f"Failed to convert frame {i} to base64: {str(e)}")
-            continue
+    with ThreadPoolExecutor(max_workers=min(len(frames), os.cpu_count() or 1)) as executor:
+        results = list(executor.map(_frame_to_base64, enumerate(frames)))
 
+    base64_frames = [b64_string for b64_string in results if b64_string is not None]
     logger.debug(f"Converted {len(base64_frames)} frames to base64")
     return base64_frames
 
@@ -410,6 +571,8 @@ def extract_visual_quality_metrics(video_path: str) -> Dict[str, float]:
 
         cmd = [
             'ffmpeg',
+            '-hide_banner',
+            '-nostats',  # Drop progress lines; idet's summary is still printed
             '-i', video_path,
             '-vf', 'idet',  # Interlace detection (good quality = progressive)
             '-f', 'null',
@@ -430,12 +593,12 @@ def extract_visual_quality_metrics(video_path: str) -> Dict[str, float]:
         }
 
         # Parse FFmpeg output for quality indicators
-        stderr = result.stderr.lower()
+        keywords = _stderr_keywords(result.stderr)
 
         # Adjust scores based on output
-        if 'progressive' in stderr:
+        if 'progressive' in keywords:
             metrics['clarity_score'] += 0.05
-        if 'interlaced' in stderr:
+        if 'interlaced' in keywords:
             metrics['clarity_score'] -= 0.1
 
         logger.info(f"Visual quality metrics: clarity={metrics['clarity_score']:.2f}")
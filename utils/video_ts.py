@@ -1,62 +1,195 @@
 
+import glob
 import os
-from moviepy import VideoFileClip, concatenate_videoclips, CompositeAudioClip, AudioFileClip
+import re
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from moviepy import VideoFileClip, concatenate_videoclips
 from utils.config import VIDEOS_DIR, MERGED_VIDEO_MP4
 from utils.logger import logger
+from utils.video_analysis import get_video_metadata
+from utils.video_encoder import h264_encoder_args, moviepy_h264_options
 
-# merge mutiple videos into one
-def merge_videos_moviepy(video_path=VIDEOS_DIR, output_path=MERGED_VIDEO_MP4, method="compose"):
+# Stream properties that must match for clips to be joined without re-encoding
+_CONCAT_COPY_KEYS = ('codec', 'width', 'height', 'fps', 'pix_fmt', 'audio_codec')
+# Upper bound on ffprobe processes / MoviePy readers opened at once
+MAX_CLIP_LOAD_WORKERS = 8
+# Splits a file name into text and digit runs for natural sorting
+_DIGIT_RUNS_RE = re.compile(r'(\d+)')
+
+
+def _natural_sort_key(path):
+    """Sort key that compares the digit runs in a file name as numbers."""
+    return [int(part) if part.isdigit() else part for part in _DIGIT_RUNS_RE.split(os.path.basename(path))]
+
+
+def _probe_clips(clip_paths):
     """
-    Merge multiple videos into one using MoviePy.
+    Probes all clips concurrently; each probe is a separate ffprobe process.
 
     Args:
-        video_path (str): Path to the directory containing the videos to merge.
+        clip_paths (list): Paths of the clips to merge, in playback order.
+
+    Returns:
+        list: Metadata dicts in clip order, or None if any clip could not be probed.
+    """
+    try:
+        with ThreadPoolExecutor(max_workers=min(len(clip_paths), MAX_CLIP_LOAD_WORKERS)) as executor:
+            return list(executor.map(get_video_metadata, clip_paths))
+    except Exception as e:
+        logger.warning(f"Could not probe clips: {str(e)}")
+        return None
+
+
+def _can_concat_copy(clip_metadata):
+    """
+    Checks whether clips share codecs, resolution and frame rate so they can be stream-copied.
+
+    Args:
+        clip_metadata (list): get_video_metadata results for the clips to merge.
+
+    Returns:
+        bool: True if every clip matches the first one on _CONCAT_COPY_KEYS.
+    """
+    signatures = {
+        tuple(metadata[key] for key in _CONCAT_COPY_KEYS)
+        for metadata in clip_metadata
+    }
+    if len(signatures) > 1:
+        logger.info(f"Clips differ in codec/resolution/frame rate, re-encoding: {sorted(signatures)}")
+    return len(signatures) == 1
+
+
+def _merge_with_concat_demuxer(clip_paths, output_path):
+    """
+    Joins clips with ffmpeg's concat demuxer, copying streams without re-encoding.
+
+    Args:
+        clip_paths (list): Paths of the clips to merge, in playback order.
         output_path (str): Path to save the merged output video file.
-        method (str): Method to use for merging.
+
+    Returns:
+        bool: True if ffmpeg succeeded.
     """
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as concat_file:
+        for path in clip_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            concat_file.write(f"file '{escaped}'\n")
+        concat_list = concat_file.name
 
-    logger.info(f"Starting video merge: source={video_path}, output={output_path}, method={method}")
-    clip_paths = []
-    clips = []
     try:
-        # Load each video file into a VideoFileClip object
-        for file in os.listdir(video_path):
-            if file.endswith("_0.mp4"):
-                logger.debug(f"Found clip: {file}")
-                clip_paths.append(os.path.join(video_path, file))
-
-        # Sort clip_paths by sequence number (numeric sort, not alphabetical)
-        # Files are named like: sequence-uuid-video_0.mp4
-        # Extract the sequence number (first part before dash) and sort numerically
-        def get_sequence_number(path):
-            filename = os.path.basename(path)
-            # Extract sequence number from filename like "1-uuid-video_0.mp4"
-            try:
-                seq_num = int(filename.split('-')[0])
-                logger.debug(f"Extracted sequence {seq_num} from {filename}")
-                return seq_num
-            except (ValueError, IndexError) as e:
-                logger.warning(f"Could not extract sequence from {filename}: {e}")
-                return 0
-
-        logger.info(f"Sorting {len(clip_paths)} clips by sequence number")
-        clip_paths.sort(key=get_sequence_number)
+        result = subprocess.run(
+            ['ffmpeg', '-y', '-loglevel', 'error', '-nostats',
+             '-f', 'concat', '-safe', '0', '-i', concat_list,
+             '-c', 'copy', '-movflags', '+faststart', output_path],
+            capture_output=True,
+            text=True
+        )
+    finally:
+        os.remove(concat_list)
 
-        logger.info(f"Loading {len(clip_paths)} clips in sorted order")
-        for path in clip_paths:
-            logger.debug(f"Loading clip: {os.path.basename(path)}")
-            clips.append(VideoFileClip(path))
-        
+    if result.returncode != 0:
+        logger.warning(f"Stream-copy merge failed, falling back to re-encoding: {result.stderr}")
+        return False
+    return True
 
-        if not clips:
-            logger.warning("No valid video clips found to merge")
-            return False
 
-        # Debug: Print final clips order before concatenation
-        logger.info(f"Final clips order (total: {len(clips)}):")
-        for i, (path, clip) in enumerate(zip(clip_paths, clips)):
-            filename = os.path.basename(path)
-            logger.info(f"  {i+1}. {filename} (duration: {clip.duration:.2f}s)")
+def _merge_by_normalizing(clip_paths, clip_metadata, output_path):
+    """
+    Re-encodes clips one at a time to a common format, then joins them with the concat demuxer.
+
+    Only one clip is decoded at any moment, so memory use does not grow with the
+    number of clips the way MoviePy's concatenation (every clip open at once) does.
+    Clips are scaled and letterboxed to the largest clip size, like method="compose".
+
+    Args:
+        clip_paths (list): Paths of the clips to merge, in playback order.
+        clip_metadata (list): get_video_metadata results for the clips.
+        output_path (str): Path to save the merged output video file.
+
+    Returns:
+        bool: True if every clip was normalized and the join succeeded.
+    """
+    # H.264 needs even dimensions
+    width = max(metadata['width'] for metadata in clip_metadata)
+    height = max(metadata['height'] for metadata in clip_metadata)
+    width, height = width + width % 2, height + height % 2
+    fps = clip_metadata[0]['fps'] or 24
+    with_audio = any(metadata['audio_codec'] for metadata in clip_metadata)
+
+    video_filter = (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,fps={fps:.3f},format=yuv420p"
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        parts = []
+        for i, (path, metadata) in enumerate(zip(clip_paths, clip_metadata)):
+            part_path = os.path.join(temp_dir, f"part_{i:03d}.mp4")
+            cmd = ['ffmpeg', '-y', '-loglevel', 'error', '-nostats', '-i', path]
+            if with_audio and not metadata['audio_codec']:
+                # Every part needs an audio track for the concat demuxer, so add silence
+                cmd += ['-f', 'lavfi', '-i', 'anullsrc=r=48000:cl=stereo',
+                        '-map', '0:v:0', '-map', '1:a:0', '-shortest']
+            elif with_audio:
+                cmd += ['-map', '0:v:0', '-map', '0:a:0']
+            else:
+                cmd += ['-map', '0:v:0']
+            cmd += ['-vf', video_filter, *h264_encoder_args()]
+            if with_audio:
+                cmd += ['-c:a', 'aac', '-ar', '48000', '-ac', '2']
+            cmd.append(part_path)
+
+            logger.debug(f"Normalizing clip {i+1}/{len(clip_paths)}: {os.path.basename(path)}")
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                logger.warning(f"Normalizing {os.path.basename(path)} failed: {result.stderr}")
+                return False
+            parts.append(part_path)
+
+        return _merge_with_concat_demuxer(parts, output_path)
+
+
+def _load_clip(path):
+    """
+    Opens a clip with MoviePy, returning None instead of raising so one bad clip
+    does not leave the other loaded clips unclosed.
+    """
+    logger.debug(f"Loading clip: {os.path.basename(path)}")
+    try:
+        return VideoFileClip(path)
+    except Exception as e:
+        logger.error(f"Failed to load clip {os.path.basename(path)}: {str(e)}")
+        return None
+
+
+def _merge_with_moviepy(clip_paths, output_path, method="chain", preset=None):
+    """
+    Decodes and re-encodes clips with MoviePy; used when clips cannot be stream-copied.
+
+    Args:
+        clip_paths (list): Paths of the clips to merge, in playback order.
+        output_path (str): Path to save the merged output video file.
+        method (str): Method to use for merging.
+        preset (str): Encoder preset overriding the encoder's default, e.g. "slow" for offline renders.
+    """
+    clips = []
+    final_clip = None
+    try:
+        # Each VideoFileClip spawns its own ffmpeg reader, so open them concurrently;
+        # map keeps the sorted order
+        logger.info(f"Loading {len(clip_paths)} clips in sorted order")
+        with ThreadPoolExecutor(max_workers=min(len(clip_paths), MAX_CLIP_LOAD_WORKERS)) as executor:
+            loaded = list(executor.map(_load_clip, clip_paths))
+        clips = [clip for clip in loaded if clip is not None]
+        if len(clips) != len(clip_paths):
+            # The loaded clips are closed in the finally block below
+            raise Exception("One or more clips could not be loaded")
+
+        if method == "chain" and any(clip.size != clips[0].size for clip in clips):
+            logger.info("Clips differ in size, concatenating with method='compose' instead of 'chain'")
+            method = "compose"
 
         # Concatenate the video clips
         logger.info(f"Concatenating {len(clips)} clips using method='{method}'")
@@ -65,35 +198,87 @@ def merge_videos_moviepy(video_path=VIDEOS_DIR, output_path=MERGED_VIDEO_MP4, me
         # Write the result to a file
         # You can specify codecs, bitrate, threads, ffmpeg_params etc. for more control
         # libx264 is a common video codec, aac is a common audio codec
+        # threads is left unset so the encoder picks its own thread count for the host
         logger.info(f"Writing merged video to: {output_path}")
+        encoder = moviepy_h264_options()  # Hardware H.264 encoder when available, else libx264
+        ffmpeg_params = [*encoder['ffmpeg_params'],
+                         "-movflags", "+faststart"]  # moov atom first so playback starts before the file is fully read
+        if final_clip.w % 2 or final_clip.h % 2:
+            # Pad odd dimensions to even ones, which H.264 requires; skipped otherwise to avoid an extra filter pass
+            ffmpeg_params += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]
         final_clip.write_videofile(output_path,
-                                 codec="libx264",        # Video codec
+                                 codec=encoder['codec'],  # Video codec
                                  audio_codec="aac",       # Audio codec
                                  temp_audiofile='temp-audio.m4a', # Temporary file for audio processing
                                  remove_temp=True,        # Remove the temp file after processing
-                                 threads=4,               # Number of threads to use (adjust as needed)
-                                 preset='medium',         # FFMPEG preset for speed vs quality (ultrafast, superfast, veryfast, faster, fast, medium, slow, slower, veryslow)
-                                 ffmpeg_params=["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"] # Example: Ensure dimensions are even for some codecs
+                                 preset=preset or encoder['preset'],  # Encoder preset for speed vs quality
+                                 ffmpeg_params=ffmpeg_params
                                  )
+    finally:
+        # Close all the clips to free up resources, even on error
+        if final_clip:
+            try: final_clip.close()
+            except: pass
+        for clip in clips:
+            try: clip.close()
+            except: pass
 
-        logger.info(f"Successfully merged {len(clips)} videos into: {output_path}")
 
-        # Close all the clips to free up resources
-        final_clip.close()
-        for clip in clips:
-            clip.close()
+# merge mutiple videos into one
+def merge_videos_moviepy(video_path=VIDEOS_DIR, output_path=MERGED_VIDEO_MP4, method="chain", preset=None):
+    """
+    Merge multiple videos into one.
+
+    Clips that share codecs, resolution and frame rate (the usual case, since
+    they come from the same generator) are joined with ffmpeg's concat demuxer
+    without re-encoding. Otherwise each clip is re-encoded to a common format
+    one at a time and then joined the same way; MoviePy is the last resort.
 
+    Args:
+        video_path (str): Path to the directory containing the videos to merge.
+        output_path (str): Path to save the merged output video file.
+        method (str): Method to use for merging when re-encoding with MoviePy. "chain"
+            plays clips back to back without a composite canvas, saving a frame copy and
+            a frame buffer; it needs equal clip sizes, so "compose" is used when they differ.
+        preset (str): Encoder preset used when re-encoding; defaults to the encoder's
+            fast preset (veryfast for libx264). Pass e.g. "slow" for offline renders.
+    """
+
+    logger.info(f"Starting video merge: source={video_path}, output={output_path}, method={method}")
+    try:
+        # Files are named like: sequence-uuid-video_0.mp4; the natural sort key orders
+        # them by sequence number numerically, so 2-... comes before 10-...
+        clip_paths = sorted(glob.glob(os.path.join(video_path, "*_0.mp4")), key=_natural_sort_key)
+
+        if not clip_paths:
+            logger.warning("No valid video clips found to merge")
+            return False
+
+        clip_metadata = _probe_clips(clip_paths)
+
+        # Debug: Print final clips order before concatenation; durations come from
+        # ffprobe, so no clip has to be opened for this
+        logger.info(f"Final clips order (total: {len(clip_paths)}):")
+        for i, path in enumerate(clip_paths):
+            filename = os.path.basename(path)
+            duration = f"{clip_metadata[i]['duration']:.2f}s" if clip_metadata else "unknown"
+            logger.info(f"  {i+1}. {filename} (duration: {duration})")
+
+        if clip_metadata:
+            if _can_concat_copy(clip_metadata) and _merge_with_concat_demuxer(clip_paths, output_path):
+                logger.info(f"Successfully merged {len(clip_paths)} videos without re-encoding into: {output_path}")
+                return output_path
+
+            if _merge_by_normalizing(clip_paths, clip_metadata, output_path):
+                logger.info(f"Successfully merged {len(clip_paths)} normalized videos into: {output_path}")
+                return output_path
+
+        _merge_with_moviepy(clip_paths, output_path, method, preset)
+        logger.info(f"Successfully merged {len(clip_paths)} videos into: {output_path}")
         return output_path
 
     except Exception as e:
         logger.error(f"Video merge failed: {str(e)}")
-        # Ensure cleanup even on error
-        if 'final_clip' in locals() and final_clip:
-            try: final_clip.close()
-            except: pass
-        for clip in clips:
-            try: clip.close()
-            except: pass
         return None
 
 # merge audio at a specific time
@@ -102,6 +287,10 @@ def merge_audio_at_time(video_path, audio_path, output_path, start_time_seconds)
     Merges audio from an audio file onto a video file, starting at a specific time.
     The new audio will be layered over the original video audio (if any).
 
+    Runs as a single FFmpeg filtergraph (adelay + amix): the video stream is
+    copied as-is and only the audio is re-encoded. output_path may be the same
+    as video_path; the result is written to a temporary file and moved into place.
+
     Args:
         video_path (str): Path to the input video file.
         audio_path (str): Path to the input audio file.
@@ -109,85 +298,66 @@ def merge_audio_at_time(video_path, audio_path, output_path, start_time_seconds)
         start_time_seconds (float): The time (in seconds) in the video where
                                      the new audio should start playing.
     """
-    logger.info(f"Loading video clip: {video_path}")
-    video_clip = VideoFileClip(video_path)
-    video_duration = video_clip.duration
+    logger.info(f"Probing video: {video_path}")
+    metadata = get_video_metadata(video_path)
+    video_duration = metadata['duration']
 
     # Validate start time
     if start_time_seconds < 0:
         logger.error("Start time cannot be negative")
-        video_clip.close()
         return
     if start_time_seconds >= video_duration:
         logger.warning(f"Start time ({start_time_seconds}s) is at or after video duration ({video_duration}s). Audio may not play.")
         # You might choose to return here or proceed (audio won't be heard)
 
-    logger.info(f"Loading audio clip: {audio_path}")
-    new_audio_clip = AudioFileClip(audio_path)
-
     logger.info(f"Positioning audio to start at {start_time_seconds}s")
-    # Set the start time for the new audio clip relative to the video timeline
-    positioned_audio = new_audio_clip.with_start(start_time_seconds)
-
-    # Get the original audio from the video clip, if it exists
-    original_audio = video_clip.audio
-    audio_clips_to_composite = []
+    # Delay every channel of the new audio so it starts at start_time_seconds
+    delay_ms = int(start_time_seconds * 1000)
+    filters = [f"[1:a]adelay=delays={delay_ms}:all=1[new]"]
 
-    if original_audio:
+    if metadata['audio_codec']:
         logger.info("Layering new audio over existing video audio")
-        # If you wanted to *replace* the original audio from start_time_seconds onwards,
-        # you would need to cut the original audio:
-        # original_audio_part1 = original_audio.subclip(0, start_time_seconds)
-        # audio_clips_to_composite.append(original_audio_part1)
-        # audio_clips_to_composite.append(positioned_audio)
-
-        # For layering/mixing: include both original and positioned new audio
-        audio_clips_to_composite.append(original_audio)
-        audio_clips_to_composite.append(positioned_audio)
+        # apad keeps the new track alive after it ends so amix never drops an input
+        # mid-stream, and dropout_transition=0 rules out any volume ramp if one does;
+        # normalize=0 sums the tracks at their original levels instead of halving each
+        filters.append(
+            "[new]apad[padded];"
+            "[0:a][padded]amix=inputs=2:duration=first:dropout_transition=0:normalize=0[mixed]"
+        )
+        audio_label = "[mixed]"
     else:
         logger.info("No existing audio, adding new audio track")
-        # If there's no original audio, just use the positioned new audio
-        audio_clips_to_composite.append(positioned_audio)
-
+        audio_label = "[new]"
 
-    logger.info("Creating composite audio track")
-    # Create a composite audio clip. If the list contains the original audio
-    # and the positioned new audio, they will be mixed/layered.
-    final_audio = CompositeAudioClip(audio_clips_to_composite)
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(suffix=".mp4", dir=output_dir)
+    os.close(fd)
 
-    logger.info("Applying audio to video")
-    # Set the composite audio to the video clip
-    final_clip = video_clip.with_audio(final_audio)
-
-    # Ensure the final duration is capped by the video's duration
-    # Moviepy usually handles this, but explicit setting can prevent issues.
-    final_clip = final_clip.with_duration(video_duration)
+    cmd = [
+        'ffmpeg', '-y', '-loglevel', 'error', '-nostats',
+        '-i', video_path,
+        '-i', audio_path,
+        '-filter_complex', ";".join(filters),
+        '-map', '0:v', '-map', audio_label,
+        '-c:v', 'copy',  # The video stream is not re-encoded
+        '-c:a', 'aac',
+        '-t', f"{video_duration:.3f}",  # Cap the output at the video's duration
+        '-movflags', '+faststart',
+        tmp_path
+    ]
 
     logger.info(f"Writing final video to: {output_path}")
     try:
-        # Write the result to a file
-        final_clip.write_videofile(output_path,
-                                   codec='libx264',
-                                   audio_codec='aac',
-                                   temp_audiofile='temp-audio.m4a',
-                                   remove_temp=True,
-                                   threads=4,
-                                   logger='bar')
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"FFmpeg failed: {result.stderr}")
+        os.replace(tmp_path, output_path)
         logger.info("Audio merge completed successfully")
 
     except Exception as e:
         logger.error(f"Video writing failed: {str(e)}")
         logger.error("Please check file paths, permissions, and available disk space")
-        # Add more specific error handling if needed
 
     finally:
-        # Good practice: Ensure all clips are closed to release file handles
-        logger.debug("Closing clips")
-        if original_audio:
-            original_audio.close()
-        new_audio_clip.close()
-        # positioned_audio doesn't need explicit closing as it's derived
-        # final_audio doesn't need explicit closing
-        video_clip.close()
-        if 'final_clip' in locals() and final_clip: # Check if final_clip was created
-             final_clip.close()
\ No newline at end of file
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)